@@ -1,14 +1,15 @@
 import streamlit as st
 import os
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
-from datetime import datetime
 import io # Import io for handling file bytes
 
 # Import your custom modules
 from config.settings import settings
 from src.database.db_manager import DBManager
-from src.api.jsearch_api import JSearchAPI
-from src.nlp.resume_parser import ResumeParser 
+from src.api.jsearch_api import JSearchAPI, JSearchAPIError
 from src.matching.job_matcher import JobMatcher
 
 # --- Streamlit App Configuration (MUST BE THE FIRST STREAMLIT COMMAND) ---
@@ -39,11 +40,78 @@ def get_job_matcher():
     """
     return JobMatcher()
 
+@st.cache_resource
+def get_match_executor():
+    """
+    Initializes and returns a cached process pool for parallel keyword extraction.
+    Workers use the "spawn" start method and load their own spaCy model on first use.
+    """
+    return ProcessPoolExecutor(max_workers=settings.MATCH_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
 # Get instances of the cached components
 db_manager = get_db_manager()
 jsearch_api = get_jsearch_api()
 job_matcher = get_job_matcher() # This instance contains resume_parser and semantic_matcher
 
+class NoSearchResults(Exception):
+    """Raised by cached_search_jobs for a search with no jobs, which keeps the empty result out of the cache."""
+
+# Cache API responses for an hour so repeating a search doesn't re-hit the rate-limited API.
+# Only the search arguments form the cache key; jsearch_api is a shared cached resource.
+@st.cache_data(ttl=3600, show_spinner=False)
+def cached_search_jobs(query, location, num_pages, date_posted, remote_jobs_only, employment_type):
+    """
+    Fetches jobs from the JSearch API, reusing results of identical recent searches.
+    Streamlit doesn't cache a call that raises, so failed and empty searches are retried next time
+    instead of returning "0 jobs" for an hour.
+    """
+    jobs = jsearch_api.search_jobs(
+        query=query,
+        location=location,
+        num_pages=num_pages,
+        date_posted=date_posted,
+        remote_jobs_only=remote_jobs_only,
+        employment_type=employment_type
+    )
+    if not jobs:
+        raise NoSearchResults()
+    return jobs
+
+@st.cache_data(show_spinner=False)
+def parse_uploaded(name, digest, _data_bytes):
+    """
+    Parses an uploaded resume, memoized on its name and content hash so identical
+    uploads are only parsed once. The raw bytes (underscore arg) are not hashed by Streamlit.
+    """
+    resume_buffer = io.BytesIO(_data_bytes)
+    resume_buffer.name = name # parse_resume detects the file type from the name
+    return job_matcher.resume_parser.parse_resume(resume_buffer, is_file_path=False)
+
+@st.cache_data(show_spinner=False)
+def parse_existing(path, mtime):
+    """
+    Parses a resume from the resumes directory, memoized on its path and modification
+    time so an unchanged file is only parsed once and an edited one is re-parsed.
+    """
+    return job_matcher.resume_parser.parse_resume(path, is_file_path=True)
+
+@st.cache_data(show_spinner=False)
+def get_jobs_with_scores_cached(resume_key, limit, jobs_fingerprint):
+    """
+    Loads the top scored jobs for a resume. jobs_fingerprint (row count, max rowid) is only
+    part of the cache key: the full query re-runs only when jobs were added since the last call.
+    Status changes don't alter the fingerprint, so saving a status clears this cache.
+    """
+    return db_manager.get_jobs_with_scores(resume_key, limit=limit)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def list_resumes(resume_dir):
+    """Lists the .txt and .pdf files in the resumes directory, cached for a minute across reruns."""
+    # os.scandir reads file types from the directory entries, avoiding a stat() per file
+    with os.scandir(resume_dir) as entries:
+        return sorted(entry.name for entry in entries
+                      if entry.is_file() and entry.name.lower().endswith(('.txt', '.pdf')))
+
 # --- App Title and Introduction ---
 st.title("🔍 Smart Job Finder & Tracker")
 st.markdown("Find jobs relevant to your resume and keep track of your applications.")
@@ -52,10 +120,30 @@ st.markdown("Find jobs relevant to your resume and keep track of your applicatio
 # Initialize session state variables to store data across Streamlit reruns
 if 'parsed_resume' not in st.session_state:
     st.session_state.parsed_resume = None
-if 'jobs_data' not in st.session_state:
-    st.session_state.jobs_data = [] # Stores jobs from DB with match scores
+if 'jobs_df' not in st.session_state:
+    st.session_state.jobs_df = pd.DataFrame() # Stores jobs from DB with match scores, one column per field
 if 'selected_resume_file_name' not in st.session_state:
     st.session_state.selected_resume_file_name = "None selected"
+if 'resume_embedding' not in st.session_state:
+    st.session_state.resume_embedding = None # Embedding of the loaded resume, computed once per resume
+if 'resume_key' not in st.session_state:
+    st.session_state.resume_key = None # Identifies the resume's stored match scores in the DB
+
+def cache_resume_artifacts():
+    """
+    Precomputes the loaded resume's embedding and DB key so matching
+    doesn't re-encode the resume on every click or rerun.
+    """
+    if st.session_state.parsed_resume:
+        st.session_state.resume_embedding = job_matcher.encode_resume(st.session_state.parsed_resume)
+        # Include the weights, pre-filter threshold and embedding model variant (model, backend,
+        # quantization, precision) so stored scores are recomputed after any of them changes
+        key_source = (f"{settings.KEYWORD_WEIGHT}|{settings.SEMANTIC_WEIGHT}|{settings.SKIP_SEMANTIC_IF_KEYWORD_BELOW}|"
+                      f"{job_matcher.semantic_matcher.cache.model_tag}|{st.session_state.parsed_resume['text']}")
+        st.session_state.resume_key = hashlib.sha1(key_source.encode('utf-8')).hexdigest()[:16]
+    else:
+        st.session_state.resume_embedding = None
+        st.session_state.resume_key = None
 
 # --- Sidebar for Resume Management ---
 st.sidebar.header("📝 Resume Management")
@@ -74,21 +162,25 @@ if uploaded_file is not None:
     if st.session_state.selected_resume_file_name != uploaded_file.name:
         st.session_state.selected_resume_file_name = uploaded_file.name
         with st.spinner(f"Parsing uploaded file: {uploaded_file.name}..."):
-            # Call parse_resume on the job_matcher's resume_parser instance
-            st.session_state.parsed_resume = job_matcher.resume_parser.parse_resume(uploaded_file, is_file_path=False)
+            # getbuffer() exposes the upload's bytes without copying them
+            upload_digest = hashlib.sha1(uploaded_file.getbuffer()).hexdigest()
+            st.session_state.parsed_resume = parse_uploaded(uploaded_file.name, upload_digest, uploaded_file.getbuffer())
             if st.session_state.parsed_resume and st.session_state.parsed_resume['text']:
                 st.sidebar.success(f"'{uploaded_file.name}' loaded and parsed.")
             else:
                 st.sidebar.error(f"Failed to parse '{uploaded_file.name}'. Please check the file content.")
                 st.session_state.parsed_resume = None
+            cache_resume_artifacts()
 
 # Option 2: Select an existing resume file from the 'resumes' directory
 # This option is shown if no file is currently uploaded, or if the user wants to switch back
 # The 'uploaded_file is None' ensures that the file_uploader takes precedence
 if uploaded_file is None:
+    # Button to pick up files added to the resumes directory before the cached listing expires
+    if st.sidebar.button("↻ Rescan", key="rescan_resumes"):
+        list_resumes.clear()
     # List all .txt and .pdf files in the resumes directory
-    resume_files = [f for f in os.listdir(settings.RESUME_DIR) if f.lower().endswith(('.txt', '.pdf'))]
-    resume_files.insert(0, "Select an existing resume...") # Add a default option
+    resume_files = ["Select an existing resume..."] + list_resumes(settings.RESUME_DIR) # Add a default option
 
     selected_existing_resume = st.sidebar.selectbox(
         "Or choose from existing resumes:",
@@ -101,13 +193,14 @@ if uploaded_file is None:
         st.session_state.selected_resume_file_name = selected_existing_resume
         resume_path = os.path.join(settings.RESUME_DIR, selected_existing_resume)
         with st.spinner(f"Parsing existing file: {selected_existing_resume}..."):
-            # Call parse_resume on the job_matcher's resume_parser instance
-            st.session_state.parsed_resume = job_matcher.resume_parser.parse_resume(resume_path, is_file_path=True)
+            # The file's mtime is part of the cache key, so edits on disk invalidate the cached parse
+            st.session_state.parsed_resume = parse_existing(resume_path, os.path.getmtime(resume_path))
             if st.session_state.parsed_resume and st.session_state.parsed_resume['text']:
                 st.sidebar.success(f"'{selected_existing_resume}' loaded and parsed.")
             else:
                 st.sidebar.error(f"Failed to parse '{selected_existing_resume}'. Please check the file content.")
                 st.session_state.parsed_resume = None
+            cache_resume_artifacts()
 
 # Display current resume status in the sidebar
 st.sidebar.write("---")
@@ -141,6 +234,8 @@ with col_adv2:
     selected_employment_type = st.selectbox("Employment Type", options=employment_type_options, key="employment_type")
 with col_adv3:
     remote_only = st.checkbox("Remote Jobs Only", key="remote_only")
+    force_refresh = st.checkbox("Force refresh", key="force_refresh",
+                                help="Ignore cached search results and query the API again.")
 
 # Button to trigger fetching and matching
 if st.button("Fetch & Match Jobs", type="primary"):
@@ -148,107 +243,140 @@ if st.button("Fetch & Match Jobs", type="primary"):
         st.error("Please load a resume first before fetching jobs.")
     else:
         with st.spinner("Fetching jobs and calculating matches... This might take a moment."):
-            # Fetch jobs from JSearch API
-            fetched_jobs_raw = jsearch_api.search_jobs(
-                query=search_query,
-                location=search_location,
-                num_pages=num_pages_to_fetch,
-                date_posted=selected_date_posted if selected_date_posted != "all" else None,
-                remote_jobs_only=remote_only,
-                employment_type=selected_employment_type if selected_employment_type else None
-            )
-
-            new_jobs_count = 0
-            # Process and store newly fetched jobs into the database
-            for job in fetched_jobs_raw:
-                # db_manager.insert_job returns True if new, False if duplicate or error
-                if db_manager.insert_job(job): 
-                    new_jobs_count += 1
-            
-            st.success(f"Fetched {len(fetched_jobs_raw)} jobs. {new_jobs_count} new jobs added to database.")
-            st.toast(f"{new_jobs_count} new jobs added!")
-
-            # Retrieve ALL jobs from DB for matching (including previously fetched ones)
-            all_jobs_from_db = db_manager.get_all_jobs()
-            
-            # Calculate scores for all jobs against the currently loaded resume
-            jobs_with_scores = []
-            if all_jobs_from_db:
-                for job in all_jobs_from_db:
-                    match_result = job_matcher.match_job_to_resume(st.session_state.parsed_resume, job)
-                    # Merge job data with match scores for display
-                    job_with_score = {**job, **match_result} 
-                    jobs_with_scores.append(job_with_score)
-                
-                # Sort jobs by final_score in descending order (highest relevance first)
-                st.session_state.jobs_data = sorted(jobs_with_scores, key=lambda x: x['final_score'], reverse=True)
+            if force_refresh:
+                cached_search_jobs.clear()
+            # Fetch jobs from JSearch API (cached for identical searches)
+            try:
+                fetched_jobs_raw = cached_search_jobs(
+                    query=search_query,
+                    location=search_location,
+                    num_pages=num_pages_to_fetch,
+                    date_posted=selected_date_posted if selected_date_posted != "all" else None,
+                    remote_jobs_only=remote_only,
+                    employment_type=selected_employment_type if selected_employment_type else None
+                )
+            except NoSearchResults:
+                st.info("The search returned no jobs. Showing jobs already in the database.")
+                fetched_jobs_raw = []
+            except JSearchAPIError as e:
+                st.error(f"Could not fetch jobs: {e} Showing jobs already in the database.")
+                fetched_jobs_raw = []
+
+            if fetched_jobs_raw:
+                # Drop jobs already in the database using one query for all known IDs
+                existing_job_ids = db_manager.get_all_job_ids()
+                new_jobs = [job for job in fetched_jobs_raw if job.get('job_id') not in existing_job_ids]
+                # Store the remaining jobs in one transaction
+                # db_manager.insert_jobs returns how many were inserted (duplicates are ignored)
+                new_jobs_count = db_manager.insert_jobs(new_jobs) if new_jobs else 0
+
+                st.success(f"Fetched {len(fetched_jobs_raw)} jobs. {new_jobs_count} new jobs added to database.")
+                st.toast(f"{new_jobs_count} new jobs added!")
+
+            # Only score jobs that have no stored scores for this resume yet
+            unscored_jobs = db_manager.get_unscored_jobs(st.session_state.resume_key)
+            if unscored_jobs:
+                # Score the new jobs in one batch (a single encode call for all job descriptions)
+                match_results = job_matcher.match_jobs_to_resume(
+                    st.session_state.parsed_resume,
+                    unscored_jobs,
+                    resume_embedding=st.session_state.resume_embedding,
+                    executor=get_match_executor()
+                )
+                stored = db_manager.upsert_matches(
+                    st.session_state.resume_key,
+                    [{'job_id': job['job_id'], **match_result} for job, match_result in zip(unscored_jobs, match_results)]
+                )
+                if stored:
+                    # New scores don't change the jobs fingerprint, so drop cached rows that lack them
+                    get_jobs_with_scores_cached.clear()
+                else:
+                    st.error("Could not save the match scores. They will be recalculated on the next fetch.")
+
+            # Load the top-K jobs, already sorted by final_score (highest relevance first)
+            jobs_df = pd.DataFrame(get_jobs_with_scores_cached(
+                st.session_state.resume_key, settings.TOP_K_MATCHES, db_manager.get_jobs_fingerprint()
+            ))
+            # Missing text fields become NaN in a DataFrame (which is truthy), so use empty strings instead
+            st.session_state.jobs_df = jobs_df.fillna('')
+            if not st.session_state.jobs_df.empty:
                 st.toast("Matching complete!")
             else:
-                st.session_state.jobs_data = []
                 st.warning("No jobs found in the database to match.")
 
+@st.fragment
+def render_job(job, status_options):
+    """
+    Renders one job listing (a row from jobs_df.itertuples()) with its status controls.
+    As a fragment, saving a status reruns only this job's block instead of the whole app.
+    """
+    job_id_db = job.job_id # Use JSearch's unique job_id for keying
+    # Read the status from the DataFrame: a fragment rerun gets the original (stale) row
+    current_status = st.session_state.jobs_df.at[job.Index, 'status']
+
+    # Use an expander for each job to show/hide details
+    with st.expander(f"**{job.job_title}** at **{job.company_name}** (Score: {job.final_score}%) - Status: **{current_status.upper()}**"):
+        st.markdown(f"**Location:** {job.location}")
+        st.markdown(f"**Employment Type:** {job.job_employment_type}")
+        st.markdown(f"**Posted (UTC):** {job.job_posted_at_datetime_utc}")
+        if job.job_url:
+            st.markdown(f"**Apply Link:** [Click Here]({job.job_url})")
+        if job.employer_website:
+            st.markdown(f"**Company Website:** [Click Here]({job.employer_website})")
+
+        st.subheader("Match Details")
+        st.write(f"**Keyword Match:** {job.keyword_score}%")
+        st.write(f"**Semantic Match:** {job.semantic_score}%")
+        if job.matched_keywords: # Display matched keywords if available
+            st.write(f"**Common Keywords:** {', '.join(job.matched_keywords)}")
+
+        st.subheader("Job Description")
+        # Listings are loaded without descriptions; fetch this one only when asked for
+        if st.toggle("Show job description", key=f"show_description_{job_id_db}"):
+            full_job = db_manager.get_job_by_id(job_id_db)
+            st.write(full_job['job_description'] if full_job else "Description unavailable.")
+
+        # Status update functionality for individual jobs
+        new_status = st.selectbox(
+            f"Update Status for {job_id_db}:", # Label for the selectbox
+            options=status_options[1:], # Options are "new", "seen", "applied", etc. (excluding "All")
+            # Set default selected option to the job's current status
+            index=status_options[1:].index(current_status) if current_status in status_options[1:] else 0,
+            key=f"status_select_{job_id_db}" # Unique key for each selectbox per job
+        )
+
+        if st.button(f"Save Status for {job_id_db}", key=f"save_status_{job_id_db}"):
+            if db_manager.update_job_status(job_id_db, new_status):
+                st.toast(f"Status for '{job.job_title}' updated to '{new_status}'.")
+                # Update the cached job in place and redraw only this fragment,
+                # instead of clearing the job data and re-running the whole app
+                st.session_state.jobs_df.at[job.Index, 'status'] = new_status
+                get_jobs_with_scores_cached.clear() # Cached rows still hold the old status
+                st.rerun(scope="fragment")
+            else:
+                st.error(f"Failed to update status for '{job.job_title}'.")
+
 # --- Display Matched Job Listings ---
 st.header("Matched Job Listings")
 
-if not st.session_state.jobs_data:
+if st.session_state.jobs_df.empty:
     st.info("No jobs to display yet. Please load a resume and fetch jobs.")
 else:
-    st.write(f"Displaying {len(st.session_state.jobs_data)} matched jobs, sorted by relevance.")
+    st.write(f"Displaying {len(st.session_state.jobs_df)} matched jobs, sorted by relevance.")
 
     # Status filter for displayed jobs
     st.subheader("Filter by Status")
     status_options = ["All", "new", "seen", "applied", "interviewing", "rejected"]
     selected_status_filter = st.multiselect("Select statuses to display:", options=status_options, default=["All"])
 
-    filtered_jobs = []
-    if "All" in selected_status_filter:
-        filtered_jobs = st.session_state.jobs_data
-    else:
-        # Filter jobs whose status is in the selected_status_filter list
-        filtered_jobs = [job for job in st.session_state.jobs_data if job['status'] in selected_status_filter]
+    # Filter jobs whose status is in the selected_status_filter list (vectorized over the status column)
+    jobs_df = st.session_state.jobs_df
+    mask = jobs_df['status'].isin(selected_status_filter) if "All" not in selected_status_filter else slice(None)
+    filtered_jobs = jobs_df.loc[mask]
 
-    if not filtered_jobs:
+    if filtered_jobs.empty:
         st.info("No jobs found matching the selected status filters.")
     else:
         # Iterate through filtered jobs and display them
-        for job in filtered_jobs:
-            job_id_db = job['job_id'] # Use JSearch's unique job_id for keying
-
-            # Use an expander for each job to show/hide details
-            with st.expander(f"**{job['job_title']}** at **{job['company_name']}** (Score: {job['final_score']}%) - Status: **{job['status'].upper()}**"):
-                st.markdown(f"**Location:** {job['location']}")
-                st.markdown(f"**Employment Type:** {job['job_employment_type']}")
-                st.markdown(f"**Posted (UTC):** {job['job_posted_at_datetime_utc']}")
-                if job['job_url']:
-                    st.markdown(f"**Apply Link:** [Click Here]({job['job_url']})")
-                if job['employer_website']:
-                    st.markdown(f"**Company Website:** [Click Here]({job['employer_website']})")
-
-                st.subheader("Match Details")
-                st.write(f"**Keyword Match:** {job['keyword_score']}%")
-                st.write(f"**Semantic Match:** {job['semantic_score']}%")
-                if job.get('matched_keywords'): # Display matched keywords if available
-                    st.write(f"**Common Keywords:** {', '.join(job['matched_keywords'])}")
-
-                st.subheader("Job Description")
-                st.write(job['job_description'])
-
-                # Status update functionality for individual jobs
-                current_status = job['status']
-                new_status = st.selectbox(
-                    f"Update Status for {job_id_db}:", # Label for the selectbox
-                    options=status_options[1:], # Options are "new", "seen", "applied", etc. (excluding "All")
-                    # Set default selected option to the job's current status
-                    index=status_options[1:].index(current_status) if current_status in status_options[1:] else 0,
-                    key=f"status_select_{job_id_db}" # Unique key for each selectbox per job
-                )
-
-                if st.button(f"Save Status for {job_id_db}", key=f"save_status_{job_id_db}"):
-                    if db_manager.update_job_status(job_id_db, new_status):
-                        st.success(f"Status for '{job['job_title']}' updated to '{new_status}'.")
-                        # To refresh the display with the new status, clear cached job data
-                        # and force a rerun of the Streamlit script. This is simple but re-computes all.
-                        st.session_state.jobs_data = [] 
-                        st.rerun()
-                    else:
-                        st.error(f"Failed to update status for '{job['job_title']}'.")
\ No newline at end of file
+        for job in filtered_jobs.itertuples():
+            render_job(job, status_options)
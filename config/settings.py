@@ -12,5 +12,27 @@ class Settings:
     KEYWORD_WEIGHT: float = 0.5    # Adjust as you fine-tune
     SEMANTIC_WEIGHT: float = 0.5   # Sum of weights should usually be 1.0, or used relative to each other
     RESUME_DIR: str = "resumes/" # Directory where resumes are stored
+    TOP_K_MATCHES: int = 200 # Number of best-scoring jobs loaded for display
+    # Worker processes for parallel keyword extraction; each loads its own spaCy model, so keep it small
+    MATCH_WORKERS: int = min(4, os.cpu_count() or 1)
+    PARALLEL_MATCH_MIN_JOBS: int = 100 # Below this many jobs, process startup/IPC costs more than it saves
+    SEMANTIC_INT8_QUANTIZATION: bool = True # Quantize the embedding model to int8 when running on CPU
+    SEMANTIC_GPU_HALF_PRECISION: bool = True # Run the embedding model in fp16 when it's on a CUDA GPU
+    # "torch", or "onnx" to run the embedding model on ONNX Runtime (pip install "sentence-transformers[onnx]")
+    SEMANTIC_BACKEND: str = "torch"
+    # ONNX file within the model repo; "" uses onnx/model.onnx. Pre-quantized int8 variants include
+    # "onnx/model_quint8_avx2.onnx" and "onnx/model_qint8_avx512_vnni.onnx"
+    SEMANTIC_ONNX_FILE: str = ""
+    # Skip the (expensive) semantic score for jobs whose keyword score (0 to 1) is below this and whose
+    # title shares no skill with the resume. 0.0 disables it: the keyword list is domain-specific.
+    SKIP_SEMANTIC_IF_KEYWORD_BELOW: float = 0.0
+    EMBEDDING_CACHE_PATH: str = "data/embedding_cache.db" # Disk tier of the embedding cache ("" = memory only)
+    EMBEDDING_CACHE_SIZE: int = 4096 # Embeddings kept in memory
+    EMBEDDING_CACHE_DISK_MAX: int = 50000 # Embeddings kept on disk (~45MB for a 384-dim model); 0 = no limit
+    # Encode large batches of job descriptions in a pool of worker processes (one model copy each), so
+    # tokenization runs in parallel too. Off by default: it pays off only for big batches and enough RAM
+    SEMANTIC_MULTI_PROCESS_ENCODE: bool = False
+    # Intra-op threads for the single-process encode path; 0 keeps torch's default (one per physical core)
+    SEMANTIC_TORCH_THREADS: int = 0
 
 settings = Settings()
\ No newline at end of file
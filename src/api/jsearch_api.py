@@ -1,4 +1,8 @@
 import requests
+from requests.adapters import HTTPAdapter
+import asyncio
+import aiohttp
+import orjson
 import logging
 import time # For potential rate limiting or delays
 from config.settings import settings # Import your settings
@@ -7,6 +11,10 @@ from config.settings import settings # Import your settings
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+class JSearchAPIError(Exception):
+    """Raised when a job search request fails, so callers can tell an outage apart from zero results."""
+
+
 class JSearchAPI:
     """
     Manages API requests to the JSearch API via RapidAPI.
@@ -18,10 +26,12 @@ class JSearchAPI:
         "job_details": "job-details",
         "search_filters": "search-filters", # Useful for understanding available filters
     }
+    MAX_CONCURRENT_REQUESTS = 4 # Caps parallel page fetches to stay under RapidAPI rate limits
+    REQUEST_TIMEOUT = 15 # seconds, total time allowed per request
 
     def __init__(self):
         """
-        Initializes the JSearchAPI client with necessary headers.
+        Initializes the JSearchAPI client with necessary headers and a pooled HTTP session.
         """
         self.headers = {
             "X-RapidAPI-Host": "jsearch.p.rapidapi.com",
@@ -31,6 +41,11 @@ class JSearchAPI:
             logger.error("JSEARCH_API_KEY not found in environment variables. Please set it in your .env file.")
             raise ValueError("JSEARCH_API_KEY is missing. Cannot proceed without API access.")
 
+        # Reuse one session so keep-alive connections skip the TCP/TLS handshake on every request
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=0)) # Retries handled in _make_request
+
     def _make_request(self, endpoint: str, params: dict) -> dict | None:
         """
         Internal helper method to make a request to the JSearch API.
@@ -49,9 +64,9 @@ class JSearchAPI:
         for attempt in range(max_retries):
             try:
                 logger.info(f"Making API request to {endpoint} (Attempt {attempt + 1}/{max_retries}) with params: {params}")
-                response = requests.get(url, headers=self.headers, params=params)
+                response = self.session.get(url, params=params, timeout=self.REQUEST_TIMEOUT)
                 response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-                return response.json()
+                return orjson.loads(response.content) # orjson parses large JSON pages faster than the stdlib
             except requests.exceptions.HTTPError as e:
                 logger.error(f"HTTP Error for {endpoint} (Status {e.response.status_code}): {e}")
                 if e.response.status_code == 429: # Rate limit exceeded
@@ -100,9 +115,13 @@ class JSearchAPI:
 
         Returns:
             list[dict]: A list of job dictionaries. Each dictionary contains job details
-                        as returned by the JSearch API. Returns an empty list on failure.
+                        as returned by the JSearch API.
+
+        Raises:
+            JSearchAPIError: If the request for every page failed (after retries). When only some
+                             pages fail, the jobs from the others are returned and a warning is logged.
         """
-        all_jobs = []
+        page_params = []
         for p in range(page, page + num_pages):
             params = {
                 "query": query,
@@ -120,19 +139,144 @@ class JSearchAPI:
                 params["employment_type"] = employment_type
             if experience_level:
                 params["job_requirements"] = experience_level # JSearch can use this for exp level
+            page_params.append(params)
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop in this thread (the normal case for Streamlit scripts): fetch pages concurrently
+            return asyncio.run(self._search_jobs_async(page_params))
+
+        # asyncio.run() cannot be nested inside a running loop, so fall back to sequential requests
+        logger.warning("An event loop is already running. Fetching pages sequentially.")
+        return self._search_jobs_sync(page_params)
+
+    def _collect_jobs(self, params: dict, response_data: dict | None) -> list[dict]:
+        """
+        Extracts the job list from a search response and tags each job with its source.
+
+        Args:
+            params (dict): The query parameters used for the request (for logging).
+            response_data (dict | None): The JSON response data, or None if the request failed.
+
+        Returns:
+            list[dict]: The jobs contained in the response, or an empty list.
+        """
+        if response_data and response_data.get("data"):
+            # Add source information to each job
+            for job in response_data["data"]:
+                job['api_source'] = 'jsearch'
+            return response_data["data"]
+        logger.warning(f"No data returned for query '{params['query']}', page {params['page']} or API error.")
+        return []
 
+    def _search_jobs_sync(self, page_params: list[dict]) -> list[dict]:
+        """
+        Fetches search result pages one after another. Used when an event loop is already running.
+
+        Args:
+            page_params (list[dict]): Query parameters for each page to fetch.
+
+        Returns:
+            list[dict]: The combined list of jobs from the pages fetched before any failure.
+
+        Raises:
+            JSearchAPIError: If the first page could not be fetched, so nothing was.
+        """
+        all_jobs = []
+        for params in page_params:
             response_data = self._make_request("search", params)
-            if response_data and response_data.get("data"):
-                # Add source information to each job
-                for job in response_data["data"]:
-                    job['api_source'] = 'jsearch'
-                all_jobs.extend(response_data["data"])
-            else:
-                logger.warning(f"No data returned for query '{query}', page {p} or API error.")
-                # If a page fails, subsequent pages might also fail due to rate limits or invalid query
-                if response_data is None: # Only break if a critical error or rate limit
-                    break
-            time.sleep(0.5) # Small delay between page requests to be polite to API
+            # If a page fails, subsequent pages might also fail due to rate limits or invalid query
+            if response_data is None:
+                if params is page_params[0]:
+                    raise JSearchAPIError(f"Fetching '{params['query']}' failed.")
+                logger.warning(f"Stopping at page {params['page']} after a failed request; returning {len(all_jobs)} jobs from earlier pages.")
+                break
+            all_jobs.extend(self._collect_jobs(params, response_data))
+        return all_jobs
+
+    async def _afetch(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, params: dict) -> dict | None:
+        """
+        Async counterpart of _make_request for the search endpoint.
+        Retries rate limits, server errors and connection problems with exponential backoff.
+
+        Args:
+            session (aiohttp.ClientSession): Shared session carrying the RapidAPI headers.
+            semaphore (asyncio.Semaphore): Limits how many requests are in flight at once.
+            params (dict): Dictionary of query parameters for the request.
+
+        Returns:
+            dict | None: The JSON response data, or None if an error occurred.
+        """
+        url = f"{self.BASE_URL}{self.ENDPOINTS['search']}"
+        max_retries = 3
+        retry_delay = 5 # seconds
+
+        for attempt in range(max_retries):
+            try:
+                # Only hold a concurrency slot while the request is in flight, not while backing off
+                async with semaphore:
+                    logger.info(f"Making async API request to search (Attempt {attempt + 1}/{max_retries}) with params: {params}")
+                    async with session.get(url, params=params) as response:
+                        if response.status < 400:
+                            return orjson.loads(await response.read())
+                        status = response.status
+                        body = await response.text()
+                logger.error(f"HTTP Error for search (Status {status})")
+                if status == 429: # Rate limit exceeded
+                    logger.warning(f"Rate limit exceeded. Retrying in {retry_delay} seconds...")
+                elif 400 <= status < 500:
+                    logger.error(f"Client error. Check request parameters. Response: {body}")
+                    return None # Don't retry client errors unless explicitly handled
+                else: # Server errors
+                    logger.warning(f"Server error. Retrying in {retry_delay} seconds...")
+            except aiohttp.ClientConnectionError as e:
+                logger.error(f"Connection Error for search: {e}. Retrying in {retry_delay} seconds...")
+            except asyncio.TimeoutError:
+                logger.error(f"Timeout Error for search. Retrying in {retry_delay} seconds...")
+            except Exception as e:
+                logger.error(f"An unexpected error occurred for search: {e}")
+                return None # For unexpected errors, don't retry
+            await asyncio.sleep(retry_delay)
+            retry_delay *= 2 # Exponential backoff
+
+        logger.error(f"Failed to fetch data from search after {max_retries} attempts.")
+        return None
+
+    async def _search_jobs_async(self, page_params: list[dict]) -> list[dict]:
+        """
+        Fetches all search result pages concurrently.
+
+        Args:
+            page_params (list[dict]): Query parameters for each page to fetch.
+
+        Returns:
+            list[dict]: The combined list of jobs from the pages that were fetched, in page order.
+
+        Raises:
+            JSearchAPIError: If no page could be fetched.
+        """
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+        timeout = aiohttp.ClientTimeout(total=self.REQUEST_TIMEOUT)
+        async with aiohttp.ClientSession(headers=self.headers, timeout=timeout) as session:
+            tasks = [asyncio.ensure_future(self._afetch(session, semaphore, p)) for p in page_params]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        all_jobs = []
+        failed_pages = []
+        for params, result in zip(page_params, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Fetching page {params['page']} failed: {result}")
+                result = None
+            if result is None:
+                failed_pages.append(params['page'])
+                continue
+            all_jobs.extend(self._collect_jobs(params, result))
+
+        if len(failed_pages) == len(page_params):
+            raise JSearchAPIError(f"Fetching '{page_params[0]['query']}' failed for every page.")
+        if failed_pages:
+            logger.warning(f"Pages {', '.join(failed_pages)} failed; returning {len(all_jobs)} jobs from the other pages.")
         return all_jobs
 
     def get_job_details(self, job_id: str) -> dict | None:
@@ -194,6 +338,8 @@ if __name__ == "__main__":
 
     except ValueError as e:
         print(f"Configuration error: {e}")
+    except JSearchAPIError as e:
+        print(f"API error: {e}")
     except Exception as e:
         print(f"An unhandled error occurred during API testing: {e}")
 
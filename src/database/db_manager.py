@@ -1,5 +1,8 @@
 import sqlite3
+import json
 import logging
+import threading
+import atexit
 from config.settings import settings
 
 # Configure logging
@@ -9,28 +12,121 @@ logger = logging.getLogger(__name__)
 class DBManager:
     """
     Manages SQLite database connections and operations for job data.
-    Each operation gets its own connection to handle Streamlit's threading model.
+    Each thread uses one pooled connection, taken over from a finished thread or opened on first use,
+    to handle Streamlit's threading model without reopening the database (and its -wal/-shm files)
+    per operation or per rerun.
     """
+    JOB_COLUMNS = (
+        'job_id', 'job_title', 'company_name', 'location', 'job_description', 'job_url',
+        'employer_website', 'job_employment_type', 'job_posted_at_datetime_utc', 'status', 'retrieved_at'
+    )
+    # Everything but job_description, which can be many KB per job and is only shown on demand
+    SUMMARY_COLUMNS = tuple(column for column in JOB_COLUMNS if column != 'job_description')
+
+    # Queries run repeatedly on the pooled connections. sqlite3 keeps a per-connection cache of
+    # compiled statements keyed by SQL text, so each of these is parsed and planned only once.
+    INSERT_SQL = """
+        INSERT OR IGNORE INTO jobs (
+            job_id, job_title, company_name, location,
+            job_description, job_url, employer_website,
+            job_employment_type, job_posted_at_datetime_utc
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    SELECT_ALL_SQL = "SELECT * FROM jobs"
+    SELECT_IDS_SQL = "SELECT job_id FROM jobs"
+    SELECT_FINGERPRINT_SQL = "SELECT COUNT(*), COALESCE(MAX(rowid), 0) FROM jobs"
+    SELECT_BY_ID_SQL = "SELECT * FROM jobs WHERE job_id = ?"
+    UPDATE_STATUS_SQL = "UPDATE jobs SET status = ? WHERE job_id = ?"
+    SELECT_UNSCORED_SQL = """
+        SELECT j.* FROM jobs j
+        LEFT JOIN job_matches m ON m.job_id = j.job_id AND m.resume_key = ?
+        WHERE m.job_id IS NULL
+    """
+    UPSERT_MATCHES_SQL = """
+        INSERT OR REPLACE INTO job_matches (
+            resume_key, job_id, keyword_score,
+            semantic_score, final_score, matched_keywords
+        ) VALUES (?, ?, ?, ?, ?, ?)
+    """
+    SELECT_WITH_SCORES_SQL = """
+        SELECT j.job_id, j.job_title, j.company_name, j.location, j.job_url, j.employer_website,
+               j.job_employment_type, j.job_posted_at_datetime_utc, j.status, j.retrieved_at,
+               m.keyword_score, m.semantic_score, m.final_score, m.matched_keywords
+        FROM job_matches m
+        JOIN jobs j ON j.job_id = m.job_id
+        WHERE m.resume_key = ?
+        ORDER BY m.final_score DESC
+        LIMIT ?
+    """
+
     def __init__(self):
         self.db_path = settings.DB_PATH
+        self._local = threading.local() # Holds this thread's connection as self._local.conn
+        self._connections = {} # threading.Thread -> connection, so connections can be closed later
+        self._connections_lock = threading.Lock()
         self.create_tables() # Ensure tables exist on init
+        self._enable_wal()
+        atexit.register(self.close)
         logger.info(f"DBManager initialized for database: {self.db_path}")
 
     def _get_connection(self):
-        """Internal method to get a new database connection."""
+        """Internal method to get this thread's database connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            with self._connections_lock:
+                # Streamlit runs every rerun on a new short-lived thread: hand this thread a connection
+                # a finished thread left behind, so reruns skip reconnecting, and close any others
+                dead_threads = [t for t in self._connections if not t.is_alive()]
+                if dead_threads:
+                    conn = self._connections.pop(dead_threads.pop())
+                for thread in dead_threads:
+                    self._close_connection(self._connections.pop(thread))
+            if conn is None:
+                conn = self._open_connection()
+            if conn:
+                self._local.conn = conn
+                with self._connections_lock:
+                    self._connections[threading.current_thread()] = conn
+        return conn
+
+    def _open_connection(self):
+        """Internal method to open and configure a new database connection."""
         try:
             # Use check_same_thread=False for Streamlit's multi-threading context
             # This is generally safe for read-heavy apps and avoids the ProgrammingError
-            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            # cached_statements: room for every query above plus ad-hoc ones without evicting
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
             conn.row_factory = sqlite3.Row # Allows accessing columns by name
+            # Per-connection tuning (journal_mode=WAL is persistent and set once in _enable_wal)
+            conn.execute("PRAGMA synchronous=NORMAL") # Safe with WAL; skips an fsync per commit
+            conn.execute("PRAGMA temp_store=MEMORY") # Keep temp tables/indices for sorts in RAM
+            conn.execute("PRAGMA cache_size=-20000") # ~20MB page cache (negative value = KiB)
+            conn.execute("PRAGMA mmap_size=268435456") # Memory-map up to 256MB of the database file
+            conn.execute("PRAGMA busy_timeout=5000") # Wait up to 5s for a lock instead of failing at once
             return conn
         except sqlite3.Error as e:
             logger.error(f"Database connection error: {e}")
             return None
 
+    def _enable_wal(self):
+        """
+        Switches the database to write-ahead logging. The setting is stored in the database
+        file, so it only needs to run once. WAL lets the UI read while a write is in progress.
+        """
+        with self._get_connection() as conn:
+            if conn:
+                try:
+                    journal_mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+                    logger.info(f"Database journal mode: {journal_mode}")
+                except sqlite3.Error as e:
+                    logger.error(f"Error enabling WAL mode: {e}")
+            else:
+                logger.error("Could not get a database connection to enable WAL mode.")
+
     def create_tables(self):
-        """Creates the 'jobs' table if it doesn't exist."""
-        with self._get_connection() as conn: # Use 'with' for auto-closing
+        """Creates the 'jobs' and 'job_matches' tables if they don't exist."""
+        # 'with conn' commits (or rolls back on error) but doesn't close the pooled connection
+        with self._get_connection() as conn:
             if conn:
                 try:
                     cursor = conn.cursor()
@@ -49,8 +145,28 @@ class DBManager:
                             retrieved_at TEXT DEFAULT CURRENT_TIMESTAMP
                         )
                     """)
+                    # Status filters and newest-first listings use these instead of scanning the table
+                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)")
+                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_retrieved ON jobs (retrieved_at DESC)")
+                    # Match scores per (resume, job), so jobs are only scored once per resume
+                    cursor.execute("""
+                        CREATE TABLE IF NOT EXISTS job_matches (
+                            resume_key TEXT NOT NULL,
+                            job_id TEXT NOT NULL,
+                            keyword_score REAL,
+                            semantic_score REAL,
+                            final_score REAL,
+                            matched_keywords TEXT, -- JSON-encoded list
+                            scored_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                            PRIMARY KEY (resume_key, job_id)
+                        )
+                    """)
+                    cursor.execute("""
+                        CREATE INDEX IF NOT EXISTS idx_job_matches_score
+                        ON job_matches (resume_key, final_score DESC)
+                    """)
                     conn.commit()
-                    logger.info("Table 'jobs' created or already exists.")
+                    logger.info("Tables 'jobs' and 'job_matches' created or already exist.")
                 except sqlite3.Error as e:
                     logger.error(f"Error creating table: {e}")
             else:
@@ -59,55 +175,80 @@ class DBManager:
 
     def insert_job(self, job_data: dict) -> bool:
         """Inserts a new job into the database. Returns True if inserted, False if duplicate."""
-        job_id = job_data.get('job_id')
-        if not job_id:
+        if not job_data.get('job_id'):
             logger.warning("Attempted to insert job with no job_id.")
             return False
+        return self.insert_jobs([job_data]) > 0
+
+    def insert_jobs(self, jobs: list[dict]) -> int:
+        """
+        Inserts many jobs in a single transaction. Returns the number of new jobs inserted.
+        sqlite3 opens one implicit transaction before the first INSERT, so the whole batch
+        costs a single commit (one fsync) instead of one per job.
+        """
+        rows = [
+            (
+                job_data.get('job_id'),
+                job_data.get('job_title'),
+                job_data.get('company_name'),
+                job_data.get('job_location'), # Note: JSearch API uses 'job_location'
+                job_data.get('job_description'),
+                job_data.get('job_apply_link'), # Note: JSearch API uses 'job_apply_link'
+                job_data.get('employer_website'),
+                job_data.get('job_employment_type'),
+                job_data.get('job_posted_at_datetime_utc')
+            )
+            for job_data in jobs if job_data.get('job_id')
+        ]
+        if len(rows) < len(jobs):
+            logger.warning(f"Skipping {len(jobs) - len(rows)} jobs with no job_id.")
+        if not rows:
+            return 0
 
         with self._get_connection() as conn:
             if conn:
                 try:
                     cursor = conn.cursor()
-                    # Use INSERT OR IGNORE to handle duplicates gracefully
-                    cursor.execute("""
-                        INSERT OR IGNORE INTO jobs (
-                            job_id, job_title, company_name, location,
-                            job_description, job_url, employer_website,
-                            job_employment_type, job_posted_at_datetime_utc
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        job_data.get('job_id'),
-                        job_data.get('job_title'),
-                        job_data.get('company_name'),
-                        job_data.get('job_location'), # Note: JSearch API uses 'job_location'
-                        job_data.get('job_description'),
-                        job_data.get('job_apply_link'), # Note: JSearch API uses 'job_apply_link'
-                        job_data.get('employer_website'),
-                        job_data.get('job_employment_type'),
-                        job_data.get('job_posted_at_datetime_utc')
-                    ))
-                    if cursor.rowcount > 0:
-                        conn.commit()
-                        logger.info(f"Inserted job: {job_data.get('job_title')} (ID: {job_id})")
-                        return True
-                    else:
-                        logger.debug(f"Job with ID: {job_id} already exists. Skipping insertion.") # Use DEBUG for less verbose
-                        return False
+                    # INSERT_SQL uses INSERT OR IGNORE to handle duplicates gracefully
+                    cursor.executemany(self.INSERT_SQL, rows)
+                    conn.commit() # One commit for the whole batch
+                    new_count = cursor.rowcount # executemany sums the rows changed by each statement
+                    logger.info(f"Inserted {new_count} new jobs ({len(rows) - new_count} already existed).")
+                    return new_count
                 except sqlite3.Error as e:
-                    logger.error(f"Error inserting job {job_id}: {e}")
-                    return False
+                    conn.rollback() # Don't leave a half-applied write open on the pooled connection
+                    logger.error(f"Error inserting {len(rows)} jobs: {e}")
+                    return 0
             else:
-                logger.error(f"Could not get a database connection to insert job {job_id}.")
-                return False
+                logger.error("Could not get a database connection to insert jobs.")
+                return 0
+
+    def get_all_jobs(self, columns: list[str] = None) -> list[sqlite3.Row]:
+        """
+        Retrieves all jobs from the database.
+        Rows are returned as sqlite3.Row rather than copied into dicts: they support row['column']
+        and row.keys(), and dict(row) or pd.DataFrame(rows, columns=rows[0].keys()) converts them.
+        Note that sqlite3.Row can't be pickled, so convert before caching with st.cache_data.
+
+        Args:
+            columns (list[str], optional): Only fetch these columns (must be in JOB_COLUMNS).
+                                           All columns are fetched if not given.
+        """
+        if columns is None:
+            query = self.SELECT_ALL_SQL
+        else:
+            unknown = [column for column in columns if column not in self.JOB_COLUMNS]
+            if unknown:
+                logger.error(f"Unknown job columns requested: {unknown}")
+                return []
+            query = f"SELECT {', '.join(columns)} FROM jobs" # Safe: names are checked against JOB_COLUMNS
 
-    def get_all_jobs(self) -> list[dict]:
-        """Retrieves all jobs from the database."""
         with self._get_connection() as conn:
             if conn:
                 try:
                     cursor = conn.cursor()
-                    cursor.execute("SELECT * FROM jobs")
-                    jobs = [dict(row) for row in cursor.fetchall()]
+                    cursor.execute(query)
+                    jobs = cursor.fetchall()
                     logger.info(f"Retrieved {len(jobs)} jobs from the database.")
                     return jobs
                 except sqlite3.Error as e:
@@ -117,13 +258,125 @@ class DBManager:
                 logger.error("Could not get a database connection to retrieve all jobs.")
                 return []
 
+    def get_jobs_summary(self) -> list[sqlite3.Row]:
+        """Retrieves all jobs without their descriptions, for listings that only show job metadata."""
+        return self.get_all_jobs(columns=list(self.SUMMARY_COLUMNS))
+
+    def get_jobs_fingerprint(self) -> tuple[int, int]:
+        """
+        Returns a cheap (row count, max rowid) fingerprint of the jobs table.
+        It changes whenever jobs are inserted or deleted, so it can key caches of job queries.
+        """
+        with self._get_connection() as conn:
+            if conn:
+                try:
+                    cursor = conn.cursor()
+                    cursor.execute(self.SELECT_FINGERPRINT_SQL)
+                    return tuple(cursor.fetchone())
+                except sqlite3.Error as e:
+                    logger.error(f"Error computing jobs fingerprint: {e}")
+                    return (0, 0)
+            else:
+                logger.error("Could not get a database connection to compute the jobs fingerprint.")
+                return (0, 0)
+
+    def get_all_job_ids(self) -> set[str]:
+        """Retrieves the IDs of all jobs in the database."""
+        with self._get_connection() as conn:
+            if conn:
+                try:
+                    cursor = conn.cursor()
+                    cursor.execute(self.SELECT_IDS_SQL)
+                    return {row[0] for row in cursor.fetchall()}
+                except sqlite3.Error as e:
+                    logger.error(f"Error retrieving job IDs: {e}")
+                    return set()
+            else:
+                logger.error("Could not get a database connection to retrieve job IDs.")
+                return set()
+
+    def get_unscored_jobs(self, resume_key: str) -> list[dict]:
+        """Retrieves the jobs that have no stored match scores for the given resume."""
+        with self._get_connection() as conn:
+            if conn:
+                try:
+                    cursor = conn.cursor()
+                    cursor.execute(self.SELECT_UNSCORED_SQL, (resume_key,))
+                    jobs = [dict(row) for row in cursor.fetchall()]
+                    logger.info(f"Retrieved {len(jobs)} unscored jobs for resume {resume_key}.")
+                    return jobs
+                except sqlite3.Error as e:
+                    logger.error(f"Error retrieving unscored jobs for resume {resume_key}: {e}")
+                    return []
+            else:
+                logger.error("Could not get a database connection to retrieve unscored jobs.")
+                return []
+
+    def upsert_matches(self, resume_key: str, matches: list[dict]) -> bool:
+        """
+        Stores match scores for a resume. Each match dict needs 'job_id', 'keyword_score',
+        'semantic_score', 'final_score' and 'matched_keywords'.
+        """
+        rows = [
+            (
+                resume_key,
+                match['job_id'],
+                match['keyword_score'],
+                match['semantic_score'],
+                match['final_score'],
+                json.dumps(match.get('matched_keywords', []))
+            )
+            for match in matches
+        ]
+        with self._get_connection() as conn:
+            if conn:
+                try:
+                    cursor = conn.cursor()
+                    cursor.executemany(self.UPSERT_MATCHES_SQL, rows)
+                    conn.commit()
+                    logger.info(f"Stored {len(rows)} match scores for resume {resume_key}.")
+                    return True
+                except sqlite3.Error as e:
+                    conn.rollback() # Don't leave a half-applied write open on the pooled connection
+                    logger.error(f"Error storing match scores for resume {resume_key}: {e}")
+                    return False
+            else:
+                logger.error("Could not get a database connection to store match scores.")
+                return False
+
+    def get_jobs_with_scores(self, resume_key: str, limit: int = settings.TOP_K_MATCHES) -> list[dict]:
+        """
+        Retrieves the `limit` best-scoring jobs for a resume, highest final_score first.
+        Descriptions are left out (see SUMMARY_COLUMNS); fetch one with get_job_by_id when needed.
+        The (resume_key, final_score DESC) index lets SQLite read just the top rows
+        instead of sorting every stored match.
+        """
+        with self._get_connection() as conn:
+            if conn:
+                try:
+                    cursor = conn.cursor()
+                    cursor.execute(self.SELECT_WITH_SCORES_SQL, (resume_key, limit))
+                    jobs = []
+                    for row in cursor.fetchall():
+                        job = dict(row)
+                        job['matched_keywords'] = json.loads(job['matched_keywords'] or '[]')
+                        jobs.append(job)
+                    logger.info(f"Retrieved {len(jobs)} scored jobs for resume {resume_key}.")
+                    return jobs
+                except sqlite3.Error as e:
+                    logger.error(f"Error retrieving scored jobs for resume {resume_key}: {e}")
+                    return []
+            else:
+                logger.error("Could not get a database connection to retrieve scored jobs.")
+                return []
+
     def get_job_by_id(self, job_id: str) -> dict | None:
         """Retrieves a single job by its ID."""
         with self._get_connection() as conn:
             if conn:
                 try:
                     cursor = conn.cursor()
-                    cursor.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+                    cursor.execute(self.SELECT_BY_ID_SQL, (job_id,))
                     job = cursor.fetchone()
                     if job:
                         logger.info(f"Retrieved job with ID: {job_id}")
@@ -144,11 +397,7 @@ class DBManager:
             if conn:
                 try:
                     cursor = conn.cursor()
-                    cursor.execute("""
-                        UPDATE jobs
-                        SET status = ?
-                        WHERE job_id = ?
-                    """, (new_status, job_id))
+                    cursor.execute(self.UPDATE_STATUS_SQL, (new_status, job_id))
                     conn.commit()
                     if cursor.rowcount > 0:
                         logger.info(f"Updated status for job {job_id} to '{new_status}'.")
@@ -157,15 +406,27 @@ class DBManager:
                         logger.warning(f"No job found with ID: {job_id} to update status.")
                         return False
                 except sqlite3.Error as e:
+                    conn.rollback() # Don't leave a half-applied write open on the pooled connection
                     logger.error(f"Error updating status for job {job_id}: {e}")
                     return False
             else:
                 logger.error(f"Could not get a database connection to update job status for {job_id}.")
                 return False
 
-    # Remove the explicit close method from here, as 'with' handles it.
-    # def close(self):
-    #     """Closes the database connection."""
-    #     if self.conn:
-    #         self.conn.close()
-    #         logger.info("Database connection closed.")
\ No newline at end of file
+    @staticmethod
+    def _close_connection(conn):
+        """Internal method to close one pooled connection, refreshing the planner statistics first."""
+        try:
+            conn.execute("PRAGMA optimize") # Refresh query-planner statistics where they're stale
+        except sqlite3.Error as e:
+            logger.warning(f"Could not optimize database before closing: {e}")
+        conn.close()
+
+    def close(self):
+        """Closes all pooled database connections. Registered to run at interpreter exit."""
+        with self._connections_lock:
+            for conn in self._connections.values():
+                self._close_connection(conn)
+            self._connections.clear()
+        self._local = threading.local() # Threads will open fresh connections if used again
+        logger.info("Database connections closed.")
@@ -1,9 +1,13 @@
 import logging
 import os
-from collections import Counter
+import threading
+from concurrent.futures import Executor
+import numpy as np
 from config.settings import settings
-from src.nlp.resume_parser import ResumeParser # Only import the class
-from src.nlp.semantic_matcher import SemanticMatcher
+# The keyword worker lives with ResumeParser so worker processes never import torch/sentence-transformers
+from src.nlp.resume_parser import ResumeParser, extract_keywords_chunk
+from src.matching.keyword_overlap import keyword_overlap_score
+from src.nlp.semantic_matcher import get_matcher
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -13,33 +17,23 @@ class JobMatcher:
     """
     Combines keyword-based and semantic-based matching to calculate job relevance.
     """
+    JOB_KEYWORD_CACHE_SIZE = 2048 # Job descriptions whose extracted keywords are kept in memory
+
     def __init__(self):
         """
         Initializes the JobMatcher by creating instances of ResumeParser and SemanticMatcher.
         """
         self.resume_parser = ResumeParser() # Will load spaCy model
-        self.semantic_matcher = SemanticMatcher() # Will load sentence-transformer model
+        self.semantic_matcher = get_matcher() # Loads the sentence-transformer model on first use per process
+        # Job description -> frozenset of its general keywords, oldest first, so rescoring
+        # the same jobs (another resume, new weights) doesn't rerun the spaCy pipeline
+        self._job_keyword_cache = {}
+        self._job_keyword_cache_lock = threading.Lock()
         logger.info("JobMatcher initialized with ResumeParser and SemanticMatcher.")
 
-    def _calculate_keyword_overlap_score(self, resume_keywords: list[str], job_keywords: list[str]) -> float:
-        """
-        Calculates a keyword overlap score between resume and job.
-        Uses Jaccard similarity for now, can be improved.
-        """
-        if not resume_keywords or not job_keywords:
-            return 0.0
-
-        resume_set = set(resume_keywords)
-        job_set = set(job_keywords)
-
-        intersection = len(resume_set.intersection(job_set))
-        union = len(resume_set.union(job_set))
-
-        if union == 0:
-            return 0.0
-
-        score = intersection / union
-        return score
+    def _calculate_keyword_overlap_score(self, resume_keywords, job_keywords) -> float:
+        """Calculates the Jaccard keyword overlap score between resume and job (see keyword_overlap_score)."""
+        return keyword_overlap_score(resume_keywords, job_keywords)
 
     def match_job_to_resume(self, resume_parsed_data: dict, job_data: dict) -> dict:
         """
@@ -55,8 +49,7 @@ class JobMatcher:
             dict: A dictionary containing the final score and individual scores.
         """
         resume_text = resume_parsed_data.get('text', '')
-        resume_skills = resume_parsed_data.get('skills', [])
-        resume_keywords = resume_parsed_data.get('keywords', [])
+        resume_keyword_set = self._resume_set(resume_parsed_data, 'keyword_set', 'keywords')
 
         job_description = job_data.get('job_description', '')
         job_title = job_data.get('job_title', '')
@@ -66,23 +59,62 @@ class JobMatcher:
             return {"final_score": 0.0, "keyword_score": 0.0, "semantic_score": 0.0}
 
         # 1. Keyword Overlap Score
-        # Extract keywords/skills from job description using the resume parser's logic
+        # Extract keywords from job description using the resume parser's logic (cached per description)
         # You might want a dedicated 'JobDescriptionParser' if job data structure varies
-        job_description_skills = self.resume_parser.extract_skills(job_description + " " + job_title)
-        job_description_keywords = self.resume_parser.extract_general_keywords(job_description)
+        job_description_keywords = self._get_job_keywords([job_description])[0]
 
         # Use resume's extracted skills/keywords vs. job's extracted skills/keywords
         # You can prioritize skills over general keywords. For simplicity, let's use all keywords for now.
-        keyword_score = self._calculate_keyword_overlap_score(resume_keywords, job_description_keywords)
+        keyword_score = self._calculate_keyword_overlap_score(resume_keyword_set, job_description_keywords)
         logger.info(f"Keyword score: {keyword_score:.4f}")
 
         # 2. Semantic Similarity Score
         # We can calculate semantic similarity between the full resume text and the full job description.
         # Or you could combine specific sections, e.g., resume skills + experience vs. job description + requirements.
-        semantic_score = self.semantic_matcher.get_semantic_score(resume_text, job_description)
-        logger.info(f"Semantic score: {semantic_score:.4f}")
+        resume_skill_set = self._resume_set(resume_parsed_data, 'skill_set', 'skills')
+        if self._skip_semantic(keyword_score, resume_skill_set, job_title):
+            semantic_score = -1.0 # Lowest cosine similarity, normalized to 0
+            logger.info("Keyword score below threshold and no title skill overlap; skipped semantic score.")
+        else:
+            semantic_score = self.semantic_matcher.get_semantic_score(resume_text, job_description)
+            logger.info(f"Semantic score: {semantic_score:.4f}")
 
         # 3. Combine Scores with Weights
+        matched_keywords = list(resume_keyword_set.intersection(job_description_keywords)) # For display
+        return self._combine_scores(keyword_score, semantic_score, matched_keywords)
+
+    @staticmethod
+    def _resume_set(resume_parsed_data: dict, set_key: str, list_key: str) -> frozenset[str]:
+        """
+        Returns a parsed resume's precomputed set (e.g. 'keyword_set'),
+        building it from the matching list (e.g. 'keywords') for older parse results.
+        """
+        values = resume_parsed_data.get(set_key)
+        if values is None:
+            values = frozenset(resume_parsed_data.get(list_key, []))
+        return values
+
+    def _skip_semantic(self, keyword_score: float, resume_skill_set: frozenset[str], job_title: str) -> bool:
+        """
+        Cheap pre-filter before the sentence-transformer: True if the job's keyword score is
+        below settings.SKIP_SEMANTIC_IF_KEYWORD_BELOW and its title mentions none of the resume's skills.
+        """
+        if keyword_score >= settings.SKIP_SEMANTIC_IF_KEYWORD_BELOW:
+            return False
+        return not job_title or resume_skill_set.isdisjoint(self.resume_parser.extract_skills(job_title))
+
+    def _combine_scores(self, keyword_score: float, semantic_score: float, matched_keywords: list[str]) -> dict:
+        """
+        Combines keyword and semantic scores into the weighted final score.
+
+        Args:
+            keyword_score (float): Keyword overlap score (0 to 1).
+            semantic_score (float): Cosine similarity between resume and job (-1 to 1).
+            matched_keywords (list[str]): Keywords shared by resume and job, for display.
+
+        Returns:
+            dict: A dictionary containing the final score and individual scores as percentages.
+        """
         # Ensure weights are defined in config/settings.py
         # You can adjust these weights based on your preferences and testing.
         # Ensure semantic_score is normalized to 0-1 if not already (cosine similarity is -1 to 1, but usually 0 to 1 for relevant texts)
@@ -103,9 +135,110 @@ class JobMatcher:
             "final_score": final_score,
             "keyword_score": round(keyword_score * 100, 2),
             "semantic_score": round(normalized_semantic_score * 100, 2),
-            "matched_keywords": list(set(resume_keywords).intersection(set(job_description_keywords))) # For display
+            "matched_keywords": matched_keywords
         }
 
+    def encode_resume(self, resume_parsed_data: dict):
+        """
+        Embeds the resume text once so it can be reused across many batched matches.
+
+        Args:
+            resume_parsed_data (dict): Dictionary containing parsed resume info.
+
+        Returns:
+            numpy.ndarray | None: The unit-length resume embedding, or None if the resume has no text.
+        """
+        resume_text = resume_parsed_data.get('text', '')
+        if not resume_text:
+            return None
+        return self.semantic_matcher.encode_many([resume_text])[0]
+
+    def _extract_job_keywords(self, descriptions: list[str], executor: Executor = None) -> list[list[str]]:
+        """
+        Extracts general keywords from many job descriptions, in order.
+        With an executor and enough jobs, the descriptions are split into one contiguous
+        chunk per worker and processed in parallel; otherwise they run in this process.
+        """
+        if executor is None or len(descriptions) < settings.PARALLEL_MATCH_MIN_JOBS:
+            return [self.resume_parser.extract_general_keywords(description) for description in descriptions]
+
+        chunk_size = -(-len(descriptions) // settings.MATCH_WORKERS) # Ceiling division
+        chunks = [descriptions[i:i + chunk_size] for i in range(0, len(descriptions), chunk_size)]
+        logger.info(f"Extracting keywords for {len(descriptions)} jobs in {len(chunks)} parallel chunks.")
+        return [keywords for chunk_keywords in executor.map(extract_keywords_chunk, chunks) for keywords in chunk_keywords]
+
+    def _get_job_keywords(self, descriptions: list[str], executor: Executor = None) -> list[frozenset[str]]:
+        """
+        Returns the general keywords of each job description, in order.
+        Only descriptions missing from the cache are extracted; the cache keeps the
+        JOB_KEYWORD_CACHE_SIZE most recently extracted descriptions.
+        """
+        cache = self._job_keyword_cache
+        with self._job_keyword_cache_lock:
+            found = {description: cache[description] for description in descriptions if description in cache}
+
+        misses = [description for description in dict.fromkeys(descriptions) if description not in found]
+        if misses:
+            extracted = dict(zip(misses, map(frozenset, self._extract_job_keywords(misses, executor))))
+            found.update(extracted)
+            with self._job_keyword_cache_lock:
+                cache.update(extracted)
+                while len(cache) > self.JOB_KEYWORD_CACHE_SIZE:
+                    del cache[next(iter(cache))] # Evict the oldest entry
+        return [found[description] for description in descriptions]
+
+    def match_jobs_to_resume(self, resume_parsed_data: dict, jobs: list[dict],
+                             resume_embedding=None, executor: Executor = None) -> list[dict]:
+        """
+        Calculates match scores for many job postings against one resume.
+        Keyword scores are computed first; the descriptions of jobs that pass the
+        SKIP_SEMANTIC_IF_KEYWORD_BELOW pre-filter are embedded in a single batched encode
+        call, and their semantic scores are computed with one matrix-vector product.
+
+        Args:
+            resume_parsed_data (dict): Dictionary containing parsed resume info
+                                       (e.g., {'text': ..., 'skills': [...], 'keywords': [...]}).
+            jobs (list[dict]): Job postings. Expected keys: 'job_description', 'job_title'.
+            resume_embedding (numpy.ndarray, optional): Precomputed result of encode_resume.
+                                                        The resume is encoded here if not given.
+            executor (Executor, optional): Process pool used to extract job keywords in parallel.
+
+        Returns:
+            list[dict]: One score dictionary per job, in the same order as `jobs`.
+        """
+        resume_text = resume_parsed_data.get('text', '')
+        resume_keyword_set = self._resume_set(resume_parsed_data, 'keyword_set', 'keywords')
+        resume_skill_set = self._resume_set(resume_parsed_data, 'skill_set', 'skills')
+        empty_score = {"final_score": 0.0, "keyword_score": 0.0, "semantic_score": 0.0, "matched_keywords": []}
+
+        descriptions = [job.get('job_description') or '' for job in jobs]
+        scorable = [i for i, description in enumerate(descriptions) if description]
+        if not resume_text or not scorable:
+            logger.warning("Resume text or all job descriptions are empty. Cannot calculate match scores.")
+            return [dict(empty_score) for _ in jobs]
+
+        all_job_keywords = self._get_job_keywords([descriptions[i] for i in scorable], executor)
+        # Set operations on a few dozen keywords per job beat building 0/1 matrices for a matrix product
+        keyword_scores = [keyword_overlap_score(resume_keyword_set, job_keywords) for job_keywords in all_job_keywords]
+
+        # Semantic scores only for jobs passing the keyword pre-filter; the rest get the lowest cosine similarity
+        semantic_scores = np.full(len(scorable), -1.0)
+        survivors = [k for k, i in enumerate(scorable)
+                     if not self._skip_semantic(keyword_scores[k], resume_skill_set, jobs[i].get('job_title') or '')]
+        if len(survivors) < len(scorable):
+            logger.info(f"Skipping semantic scoring for {len(scorable) - len(survivors)} jobs below the keyword threshold.")
+        if survivors:
+            survivor_texts = [descriptions[scorable[k]] for k in survivors]
+            multi_process = settings.SEMANTIC_MULTI_PROCESS_ENCODE and len(survivor_texts) >= settings.PARALLEL_MATCH_MIN_JOBS
+            semantic_scores[survivors] = self.semantic_matcher.rank(resume_text, survivor_texts, resume_embedding, multi_process)
+
+        results = [dict(empty_score) for _ in jobs]
+        for i, keyword_score, semantic_score, job_keywords in zip(scorable, keyword_scores, semantic_scores, all_job_keywords):
+            matched_keywords = list(resume_keyword_set.intersection(job_keywords)) # For display
+            results[i] = self._combine_scores(float(keyword_score), float(semantic_score), matched_keywords)
+        logger.info(f"Calculated match scores for {len(scorable)} jobs.")
+        return results
+
 
 # --- For Testing / Example Usage ---
 if __name__ == "__main__":
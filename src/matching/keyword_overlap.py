@@ -0,0 +1,21 @@
+def keyword_overlap_score(resume_keywords, job_keywords) -> float:
+    """
+    Calculates a keyword overlap score between resume and job.
+    Uses Jaccard similarity for now, can be improved.
+    Sets (e.g. a parsed resume's 'keyword_set') are used as-is; lists are converted.
+    Kept free of model imports so it can be used and tested without loading any NLP models.
+    """
+    if not resume_keywords or not job_keywords:
+        return 0.0
+
+    resume_set = resume_keywords if isinstance(resume_keywords, (set, frozenset)) else set(resume_keywords)
+    job_set = job_keywords if isinstance(job_keywords, (set, frozenset)) else set(job_keywords)
+
+    intersection = len(resume_set.intersection(job_set))
+    union = len(resume_set.union(job_set))
+
+    if union == 0:
+        return 0.0
+
+    score = intersection / union
+    return score
@@ -0,0 +1,173 @@
+import sqlite3
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from config.settings import settings
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """
+    Two-tier cache of text embeddings: an in-memory LRU in front of a SQLite table on disk,
+    so texts seen in earlier runs (the same resume, reposted jobs) skip the model entirely.
+    Entries are keyed by a hash of the model tag and the text, and stored as float16.
+    Both tiers evict least recently used entries: the disk tier records when each row was last
+    written or read from disk, and put_many prunes the oldest rows past its size cap.
+    (Hits served from memory don't touch the disk, so a row's age there can lag its real use.)
+    """
+    LOOKUP_CHUNK_SIZE = 500 # Keys per SELECT ... IN (...), well under SQLite's bound-parameter limit
+
+    def __init__(self, model_tag: str, db_path: str = None, memory_size: int = None, disk_max: int = None):
+        """
+        Args:
+            model_tag (str): Identifies the model (and any variant such as quantization), so
+                             embeddings from different models never mix.
+            db_path (str, optional): SQLite file for the disk tier. An empty path keeps the cache
+                                     in memory only. Defaults to settings.EMBEDDING_CACHE_PATH.
+            memory_size (int, optional): Number of embeddings kept in the in-memory tier.
+                                         Defaults to settings.EMBEDDING_CACHE_SIZE.
+            disk_max (int, optional): Number of embeddings kept in the disk tier (0 = no limit).
+                                      Defaults to settings.EMBEDDING_CACHE_DISK_MAX.
+        """
+        # Settings are read here rather than as default arguments, so changes made after import apply
+        if db_path is None:
+            db_path = settings.EMBEDDING_CACHE_PATH
+        if memory_size is None:
+            memory_size = settings.EMBEDDING_CACHE_SIZE
+        if disk_max is None:
+            disk_max = settings.EMBEDDING_CACHE_DISK_MAX
+        self.model_tag = model_tag
+        self.memory_size = memory_size
+        self.disk_max = disk_max
+        self._memory = OrderedDict() # key -> float32 embedding, least recently used first
+        self._lock = threading.Lock() # Guards the memory tier and the shared disk connection
+        self._conn = self._open_disk_tier(db_path) if db_path else None
+
+    def _open_disk_tier(self, db_path: str):
+        """Opens (and creates if needed) the SQLite file holding cached embeddings."""
+        try:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(db_path, check_same_thread=False) # Access is serialized by self._lock
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key BLOB PRIMARY KEY,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL DEFAULT 0
+                )
+            """)
+            # Caches created before the size cap lack last_used; their rows count as oldest
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(embeddings)")}
+            if 'last_used' not in columns:
+                conn.execute("ALTER TABLE embeddings ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+            conn.commit()
+            logger.info(f"Embedding cache opened at: {db_path}")
+            return conn
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Could not open embedding cache at {db_path}, caching in memory only: {e}")
+            return None
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.blake2b(f"{self.model_tag}\0{text}".encode('utf-8'), digest_size=16).digest()
+
+    def _remember(self, key: bytes, embedding: np.ndarray):
+        """Adds an embedding to the memory tier, evicting the least recently used ones. Call with the lock held."""
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get_many(self, texts: list[str]) -> list:
+        """
+        Looks up embeddings for many texts.
+
+        Returns:
+            list[numpy.ndarray | None]: The cached float32 embedding of each text, or None on a miss.
+        """
+        keys = [self._key(text) for text in texts]
+        results = [None] * len(texts)
+        with self._lock:
+            disk_misses = {}
+            for i, key in enumerate(keys):
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    results[i] = self._memory[key]
+                else:
+                    disk_misses.setdefault(key, []).append(i)
+
+            if disk_misses and self._conn is not None:
+                pending = list(disk_misses)
+                disk_hits = []
+                try:
+                    for start in range(0, len(pending), self.LOOKUP_CHUNK_SIZE):
+                        chunk = pending[start:start + self.LOOKUP_CHUNK_SIZE]
+                        rows = self._conn.execute(
+                            f"SELECT key, vector FROM embeddings WHERE key IN ({', '.join('?' * len(chunk))})", chunk
+                        ).fetchall()
+                        for key, vector in rows:
+                            embedding = np.frombuffer(vector, dtype=np.float16).astype(np.float32)
+                            self._remember(key, embedding)
+                            disk_hits.append(key)
+                            for i in disk_misses[key]:
+                                results[i] = embedding
+                    if disk_hits:
+                        # Mark the rows just read as recently used, so pruning keeps them
+                        now = time.time()
+                        self._conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?",
+                                               [(now, key) for key in disk_hits])
+                        self._conn.commit()
+                except sqlite3.Error as e:
+                    self._conn.rollback()
+                    logger.error(f"Error reading from embedding cache: {e}")
+        return results
+
+    def put_many(self, texts: list[str], embeddings) -> np.ndarray:
+        """
+        Stores the embeddings of many texts in both tiers.
+
+        Returns:
+            numpy.ndarray: The embeddings as stored (rounded to float16, as float32), so callers
+                           use exactly what a later cache hit would return.
+        """
+        embeddings16 = np.asarray(embeddings, dtype=np.float16)
+        stored = embeddings16.astype(np.float32)
+        now = time.time()
+        rows = [(self._key(text), embedding.tobytes(), now) for text, embedding in zip(texts, embeddings16)]
+        with self._lock:
+            for (key, _, _), embedding in zip(rows, stored):
+                self._remember(key, embedding)
+            if self._conn is not None:
+                try:
+                    self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)", rows)
+                    self._prune_disk_tier()
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    self._conn.rollback()
+                    logger.error(f"Error writing {len(rows)} embeddings to cache: {e}")
+        return stored
+
+    def _prune_disk_tier(self):
+        """Deletes the least recently used rows past disk_max. Call with the lock held, before committing."""
+        if not self.disk_max:
+            return
+        excess = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.disk_max
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)", (excess,)
+            )
+            logger.info(f"Pruned {excess} least recently used embeddings from the disk cache.")
+
+    def close(self):
+        """Closes the disk tier's connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -12,21 +12,47 @@ EXCLUDE_TERMS = {
     "jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"
 }
 
+_EXCLUDE = frozenset(EXCLUDE_TERMS)
+_KEYWORD_POS = frozenset({"NOUN", "PROPN"})
+
+
+_NLP = None
 
-def extract_keywords_from_text(text):
-    nlp = spacy.load("en_core_web_sm")
-    doc = nlp(text)
 
+def _get_nlp():
+    # Load the model once per process; the parser and NER aren't used for keyword extraction.
+    # The tagger, attribute_ruler and lemmatizer stay enabled for token.pos_ and token.lemma_.
+    global _NLP
+    if _NLP is None:
+        _NLP = spacy.load("en_core_web_sm", disable=["parser", "ner"])
+    return _NLP
+
+
+def _doc_keywords(doc):
     keywords = set()
 
     for token in doc:
         if (
-            token.pos_ in {"NOUN", "PROPN"}
-            and not token.is_stop
+            token.pos_ in _KEYWORD_POS
             and token.is_alpha
+            and not token.is_stop
         ):
-            word = token.lemma_.lower().strip()
-            if len(word) > 2 and word not in EXCLUDE_TERMS:
+            lemma = token.lemma_
+            if len(lemma) <= 2:  # skip short lemmas before paying for lower()
+                continue
+            word = lemma.lower().strip()
+            if len(word) > 2 and word not in _EXCLUDE:
                 keywords.add(word)
 
     return sorted(keywords)
+
+
+def extract_keywords_from_texts(texts, batch_size=32):
+    # nlp.pipe streams the documents through the pipeline in batches,
+    # which is much faster than calling nlp() once per text.
+    nlp = _get_nlp()
+    return [_doc_keywords(doc) for doc in nlp.pipe(texts, batch_size=batch_size)]
+
+
+def extract_keywords_from_text(text):
+    return extract_keywords_from_texts([text])[0]
@@ -1,9 +1,14 @@
 import spacy
+from spacy.matcher import PhraseMatcher
 import os
 import re
+import functools
 import logging
-from collections import Counter
 import pypdf # Import the pypdf library
+try:
+    import fitz # Optional: PyMuPDF extracts PDF text much faster than pypdf
+except ImportError:
+    fitz = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -12,7 +17,9 @@ logger = logging.getLogger(__name__)
 class ResumeParser:
     def __init__(self):
         try:
-            self.nlp = spacy.load('en_core_web_sm')
+            # Only the tokenizer, vocabulary and lexical attributes (is_alpha, is_stop) are used,
+            # so the statistical components aren't even loaded
+            self.nlp = spacy.load('en_core_web_sm', exclude=["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner"])
             logger.info("SpaCy model 'en_core_web_sm' loaded successfully.")
         except Exception as e:
             logger.error(f"Error loading SpaCy model: {e}. Please ensure it's installed (`python -m spacy download en_core_web_sm`).")
@@ -42,6 +49,30 @@ class ResumeParser:
         self.common_skills_lower = [s.lower() for s in self.common_skills]
         self.common_keywords_lower = [k.lower() for k in self.common_keywords]
 
+        # One PhraseMatcher pass over the tokens finds every skill, instead of one regex scan per skill
+        self._skill_matcher = None
+        if self.nlp:
+            self._skill_matcher = PhraseMatcher(self.nlp.vocab, attr="LOWER")
+            for skill in self.common_skills_lower:
+                self._skill_matcher.add(skill, [self.nlp.make_doc(skill)])
+
+        # Fallback when SpaCy isn't available: a single alternation regex scans the text once.
+        # The lookahead keeps matches zero-width so overlapping skills ('manufacturing' inside
+        # 'lean manufacturing') are all reported; longer skills are tried first.
+        skill_alternation = '|'.join(re.escape(s) for s in sorted(self.common_skills_lower, key=len, reverse=True))
+        self._skills_re = re.compile(r'(?=\b(' + skill_alternation + r')\b)')
+
+        # Single-word keywords are found by set intersection with the resume's tokens;
+        # multi-token ones (e.g. 'supply chain', 'problem-solving') need a PhraseMatcher
+        self._common_keywords_set = set(self.common_keywords_lower)
+        self._keyword_phrase_matcher = None
+        if self.nlp:
+            self._keyword_phrase_matcher = PhraseMatcher(self.nlp.vocab, attr="LOWER")
+            for keyword in self.common_keywords_lower:
+                keyword_doc = self.nlp.make_doc(keyword)
+                if len(keyword_doc) > 1:
+                    self._keyword_phrase_matcher.add(keyword, [keyword_doc])
+
 
     def _read_txt_text(self, file_path: str) -> str:
         """Reads text from a .txt file."""
@@ -55,12 +86,14 @@ class ResumeParser:
             return ""
 
     def _read_pdf_text(self, file_bytes) -> str:
-        """Reads text from PDF file bytes."""
-        text = ""
+        """Reads text from PDF file bytes, with PyMuPDF if it's installed, otherwise pypdf."""
         try:
-            reader = pypdf.PdfReader(file_bytes)
-            for page in reader.pages:
-                text += page.extract_text() or "" # extract_text can return None
+            if fitz is not None:
+                with fitz.open(stream=file_bytes.read(), filetype="pdf") as doc:
+                    text = "".join(page.get_text() for page in doc)
+            else:
+                reader = pypdf.PdfReader(file_bytes)
+                text = "".join(page.extract_text() or "" for page in reader.pages) # extract_text can return None
             logger.info("Successfully extracted text from PDF file.")
             return text
         except Exception as e:
@@ -79,12 +112,12 @@ class ResumeParser:
         if is_file_path:
             if not os.path.exists(resume_source):
                 logger.error(f"Resume file not found at: {resume_source}")
-                return {"text": "", "skills": [], "keywords": []}
+                return self._build_result("", [], [])
             if resume_source.lower().endswith('.txt'):
                 resume_text = self._read_txt_text(resume_source)
             else:
                 logger.error(f"Unsupported file type for path: {resume_source}. Only .txt is supported via path.")
-                return {"text": "", "skills": [], "keywords": []}
+                return self._build_result("", [], [])
         else: # resume_source is file bytes (from st.file_uploader)
             if hasattr(resume_source, 'name') and resume_source.name.lower().endswith('.pdf'):
                 resume_text = self._read_pdf_text(resume_source)
@@ -93,54 +126,78 @@ class ResumeParser:
                  logger.info("Successfully loaded resume text from uploaded .txt file.")
             else:
                 logger.error("Unsupported uploaded file type. Only .pdf and .txt are supported.")
-                return {"text": "", "skills": [], "keywords": []}
+                return self._build_result("", [], [])
 
         if not resume_text:
-            return {"text": "", "skills": [], "keywords": []}
+            return self._build_result("", [], [])
 
-        skills = self.extract_skills(resume_text)
-        general_keywords = self.extract_general_keywords(resume_text)
+        text_lower = resume_text.lower() # Lowercase once for both extractors
+        skills = self.extract_skills(text_lower, is_lower=True)
+        general_keywords = self.extract_general_keywords(text_lower, is_lower=True)
 
         logger.info(f"Extracted {len(skills)} skills.")
         logger.info(f"Extracted {len(general_keywords)} general keywords.")
 
-        return {"text": resume_text, "skills": skills, "keywords": general_keywords}
-
-    def extract_skills(self, text: str) -> list[str]:
-        """Extracts predefined skills from the resume text."""
-        found_skills = []
-        text_lower = text.lower()
+        return self._build_result(resume_text, skills, general_keywords)
 
-        # Check for exact matches of predefined skills
-        for skill in self.common_skills_lower:
-            if re.search(r'\b' + re.escape(skill) + r'\b', text_lower):
-                found_skills.append(skill)
-
-        # Further extraction using SpaCy's entity recognition or noun chunks could be added here
-        # For a lighter approach, we stick to predefined lists for now.
+    @staticmethod
+    def _build_result(text: str, skills: list[str], keywords: list[str]) -> dict:
+        """
+        Builds the parse_resume result. The frozensets are computed once here so
+        matching against many jobs doesn't rebuild them for every job.
+        """
+        return {
+            "text": text,
+            "skills": skills,
+            "keywords": keywords,
+            "skill_set": frozenset(skills),
+            "keyword_set": frozenset(keywords)
+        }
+
+    def extract_skills(self, text: str, is_lower: bool = False) -> list[str]:
+        """
+        Extracts predefined skills from the resume text.
+        Pass is_lower=True if the text is already lowercased to skip copying it again.
+        """
+        if self._skill_matcher:
+            # Only the tokenizer is needed; the matcher compares lowercased tokens
+            doc = self.nlp.make_doc(text)
+            found_skills = [self.nlp.vocab.strings[match_id] for match_id, _, _ in self._skill_matcher(doc)]
+        else:
+            # Fallback when the SpaCy model isn't loaded: check for exact matches of predefined skills
+            found_skills = self._skills_re.findall(text if is_lower else text.lower())
 
         return sorted(list(set(found_skills))) # Remove duplicates and sort
 
-    def extract_general_keywords(self, text: str) -> list[str]:
+    def extract_general_keywords(self, text: str, is_lower: bool = False) -> list[str]:
         """
         Extracts general keywords from the resume text using SpaCy's tokenization
         and matches against a predefined list.
+        Pass is_lower=True if the text is already lowercased to skip copying it again.
         """
         if not self.nlp:
             logger.warning("SpaCy model not loaded. Cannot extract general keywords.")
             return []
 
-        doc = self.nlp(text.lower())
-        tokens = [token.text for token in doc if token.is_alpha and not token.is_stop and len(token.text) > 2]
+        doc = self.nlp.make_doc(text if is_lower else text.lower()) # Tokenizer only
+        token_set = {token.text for token in doc if token.is_alpha and not token.is_stop and len(token.text) > 2}
+
+        found_keywords = self._common_keywords_set & token_set
+        found_keywords.update(self.nlp.vocab.strings[match_id] for match_id, _, _ in self._keyword_phrase_matcher(doc))
+
+        return sorted(found_keywords)
 
-        found_keywords = []
-        for keyword in self.common_keywords_lower:
-            if keyword in tokens or any(re.search(r'\b' + re.escape(keyword) + r'\b', token) for token in tokens):
-                found_keywords.append(keyword)
 
-        # You could also extract relevant noun chunks or entities here
-        # E.g., for general domain keywords, not necessarily from your predefined list
-        # For example, filtering noun chunks that are not skills but seem relevant:
-        # found_keywords.extend([chunk.text for chunk in doc.noun_chunks if len(chunk.text.split()) > 1 and chunk.text.lower() not in self.common_skills_lower])
+@functools.lru_cache(maxsize=1)
+def _get_worker_parser() -> ResumeParser:
+    """Returns this process's ResumeParser, loading the spaCy model on first use only."""
+    return ResumeParser()
 
-        return sorted(list(set(found_keywords)))
\ No newline at end of file
+def extract_keywords_chunk(descriptions: list[str]) -> list[list[str]]:
+    """
+    Extracts general keywords from a chunk of job descriptions.
+    Module-level so it can be pickled and run in a worker process; kept in this module,
+    which doesn't import the embedding model, so workers only load spaCy.
+    """
+    parser = _get_worker_parser()
+    return [parser.extract_general_keywords(description) for description in descriptions]
@@ -1,5 +1,11 @@
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import SentenceTransformer
+import torch
+import atexit
+import threading
+import numpy as np
 import logging
+from config.settings import settings
+from src.nlp.embedding_cache import EmbeddingCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -9,6 +15,8 @@ logger = logging.getLogger(__name__)
 # You can move this to config/settings.py later if you want to make it configurable
 SENTENCE_TRANSFORMER_MODEL = 'all-MiniLM-L6-v2' # A good balance of size and performance
 # Other popular models: 'all-mpnet-base-v2', 'multi-qa-mpnet-base-dot-v1'
+ENCODE_BATCH_SIZE_GPU = 256 # Large batches keep a GPU busy; bounded so long job descriptions fit in memory
+ENCODE_BATCH_SIZE_CPU = 32 # On CPU bigger batches mostly add padding work
 
 class SemanticMatcher:
     """
@@ -18,13 +26,78 @@ class SemanticMatcher:
         """
         Initializes the SemanticMatcher by loading the SentenceTransformer model.
         """
+        self.backend = "torch"
+        self._pool = None # Multi-process encode pool, started on demand by start_pool()
+        model_tag = SENTENCE_TRANSFORMER_MODEL
+        if settings.SEMANTIC_TORCH_THREADS:
+            torch.set_num_threads(settings.SEMANTIC_TORCH_THREADS)
+        if settings.SEMANTIC_BACKEND == "onnx":
+            self.model = self._load_onnx_model()
+            if self.model is not None:
+                self.backend = "onnx"
+                model_tag += f"|onnx|{settings.SEMANTIC_ONNX_FILE}"
+
+        if self.backend == "torch":
+            try:
+                # Fused scaled_dot_product_attention kernels (FlashAttention / memory-efficient on CUDA)
+                # instead of the eager matmul-softmax-matmul attention
+                self.model = SentenceTransformer(SENTENCE_TRANSFORMER_MODEL, model_kwargs={"attn_implementation": "sdpa"})
+                logger.info(f"Sentence Transformer model '{SENTENCE_TRANSFORMER_MODEL}' loaded successfully.")
+            except Exception as e:
+                logger.error(f"Error loading Sentence Transformer model '{SENTENCE_TRANSFORMER_MODEL}': {e}")
+                logger.warning("Please ensure 'sentence-transformers' is installed: pip install sentence-transformers")
+                raise # Re-raise to indicate a critical setup failure
+
+        # ONNX models are quantized ahead of time (SEMANTIC_ONNX_FILE) rather than with torch
+        if self.backend == "torch" and settings.SEMANTIC_INT8_QUANTIZATION and self.model.device.type == "cpu":
+            self._quantize_int8()
+            model_tag += "|int8" # Quantized embeddings differ slightly; cache them separately
+        elif self.backend == "torch" and settings.SEMANTIC_GPU_HALF_PRECISION and self.model.device.type == "cuda":
+            model_tag += f"|{self._to_half_precision()}"
+        self.cache = EmbeddingCache(model_tag)
+
+    def _load_onnx_model(self):
+        """
+        Loads the model on the ONNX Runtime backend, which typically encodes 2-3x faster than
+        PyTorch on CPU. Returns None (so the PyTorch model is used) if that isn't possible.
+        """
+        model_kwargs = {"provider": "CPUExecutionProvider"}
+        if settings.SEMANTIC_ONNX_FILE:
+            model_kwargs["file_name"] = settings.SEMANTIC_ONNX_FILE
         try:
-            self.model = SentenceTransformer(SENTENCE_TRANSFORMER_MODEL)
-            logger.info(f"Sentence Transformer model '{SENTENCE_TRANSFORMER_MODEL}' loaded successfully.")
+            model = SentenceTransformer(SENTENCE_TRANSFORMER_MODEL, backend="onnx", model_kwargs=model_kwargs)
+            logger.info(f"Sentence Transformer model '{SENTENCE_TRANSFORMER_MODEL}' loaded on ONNX Runtime.")
+            return model
         except Exception as e:
-            logger.error(f"Error loading Sentence Transformer model '{SENTENCE_TRANSFORMER_MODEL}': {e}")
-            logger.warning("Please ensure 'sentence-transformers' is installed: pip install sentence-transformers")
-            raise # Re-raise to indicate a critical setup failure
+            logger.error(f"Error loading '{SENTENCE_TRANSFORMER_MODEL}' on ONNX Runtime, falling back to PyTorch: {e}")
+            logger.warning('ONNX support needs: pip install "sentence-transformers[onnx]"')
+            return None
+
+    def _to_half_precision(self) -> str:
+        """
+        Casts the model to float16 for GPU inference: half the memory traffic, and the matmuls
+        run on tensor cores. float16 rather than bfloat16: its 10-bit mantissa keeps cosine
+        similarities within 1e-3 of float32 (see tests/test_semantic_precision.py), which
+        bfloat16's 7-bit mantissa doesn't guarantee.
+
+        Returns:
+            str: The dtype used, for the embedding cache's model tag.
+        """
+        self.model.half()
+        logger.info("Running Sentence Transformer model in fp16 on GPU.")
+        return "fp16"
+
+    def _quantize_int8(self):
+        """
+        Dynamically quantizes the transformer's Linear layers to int8.
+        On CPU this roughly halves the bytes moved per matmul and speeds up encoding,
+        at the cost of small (~1e-2) differences in similarity scores.
+        """
+        transformer = self.model[0] # The Hugging Face transformer module inside the SentenceTransformer
+        transformer.auto_model = torch.ao.quantization.quantize_dynamic(
+            transformer.auto_model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        logger.info("Quantized Sentence Transformer linear layers to int8 for CPU inference.")
 
     def get_embedding(self, text: str):
         """
@@ -34,22 +107,97 @@ class SemanticMatcher:
             text (str): The input text.
 
         Returns:
-            torch.Tensor: A tensor representing the semantic embedding of the text.
+            torch.Tensor: A tensor representing the (unit-length) semantic embedding of the text.
         """
         if not text:
             return None
-        # Encode the text to get its embedding
-        # convert_to_tensor=True ensures it returns a PyTorch tensor, which is what util.cos_sim expects
-        embedding = self.model.encode(text, convert_to_tensor=True)
-        return embedding
+        # Served from the embedding cache when the text was seen before.
+        # Returned as a tensor for callers using torch (wrapping encode_many's output array without a copy)
+        return torch.from_numpy(self.encode_many([text])[0])
+
+    def start_pool(self):
+        """
+        Starts worker processes that each hold a copy of the model (one per GPU, or several on CPU),
+        so encode_many_mp tokenizes and encodes in parallel. Does nothing if the pool is already running.
+        """
+        if self._pool is None:
+            self._pool = self.model.start_multi_process_pool()
+            atexit.register(self.stop_pool)
+            logger.info(f"Started multi-process encode pool with {len(self._pool['processes'])} workers.")
+
+    def stop_pool(self):
+        """Stops the multi-process encode pool, if it is running."""
+        if self._pool is not None:
+            SentenceTransformer.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+    def __del__(self):
+        try:
+            self.stop_pool()
+        except Exception:
+            pass # Interpreter shutdown: the pool's workers are daemons and exit with it
+
+    def encode_many_mp(self, texts: list[str], batch_size: int = 64):
+        """
+        Like encode_many, but encodes the cache misses across the multi-process pool (started if needed).
+
+        Args:
+            texts (list[str]): The input texts.
+            batch_size (int): Texts per forward pass in each worker.
+
+        Returns:
+            numpy.ndarray: Unit-length embeddings, one row per text, in input order.
+        """
+        self.start_pool()
+        return self.encode_many(texts, batch_size=batch_size, pool=self._pool)
+
+    def encode_many(self, texts: list[str], batch_size: int = None, pool: dict = None):
+        """
+        Embeds many texts in batches. Cached embeddings are reused; only the misses are encoded,
+        and repeated texts (reposted jobs, the same text in several pairs) are encoded once.
+        SentenceTransformer.encode sorts the texts by length before batching and restores their
+        order afterwards, so each batch pads to similar lengths; this picks the batch size by device.
+
+        Args:
+            texts (list[str]): The input texts.
+            batch_size (int, optional): Texts per forward pass. Chosen by device if not given.
+            pool (dict, optional): A multi-process pool from start_pool to encode the misses in.
+
+        Returns:
+            numpy.ndarray: Unit-length embeddings, one row per text, in input order.
+        """
+        # Position of each text among the distinct texts, to scatter their embeddings back at the end
+        unique_index = {}
+        inverse = np.fromiter((unique_index.setdefault(text, len(unique_index)) for text in texts),
+                              dtype=np.intp, count=len(texts))
+        unique_texts = list(unique_index)
+
+        embeddings = self.cache.get_many(unique_texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            if batch_size is None:
+                batch_size = ENCODE_BATCH_SIZE_GPU if self.model.device.type == "cuda" else ENCODE_BATCH_SIZE_CPU
+            missing_texts = [unique_texts[i] for i in missing]
+            if pool is not None:
+                fresh = self.model.encode_multi_process(missing_texts, pool, batch_size=batch_size, normalize_embeddings=True)
+            else:
+                # Inference mode skips autograd's version-counter and view tracking, which no_grad still does
+                with torch.inference_mode():
+                    fresh = self.model.encode(missing_texts, batch_size=batch_size, normalize_embeddings=True, show_progress_bar=False)
+            for i, embedding in zip(missing, self.cache.put_many(missing_texts, fresh)):
+                embeddings[i] = embedding
+        if not embeddings:
+            return np.empty((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+        return np.vstack(embeddings)[inverse]
 
     def calculate_similarity(self, embedding1, embedding2) -> float:
         """
         Calculates the cosine similarity between two semantic embeddings.
 
         Args:
-            embedding1 (torch.Tensor): The first text embedding.
-            embedding2 (torch.Tensor): The second text embedding.
+            embedding1 (torch.Tensor | numpy.ndarray): The first text embedding, unit-length as returned
+                                                       by get_embedding or encode_many.
+            embedding2 (torch.Tensor | numpy.ndarray): The second text embedding, likewise.
 
         Returns:
             float: The cosine similarity score (between -1 and 1).
@@ -58,10 +206,56 @@ class SemanticMatcher:
             return 0.0 # Or handle as an error if embeddings are expected
 
         # Cosine similarity is a common metric for semantic similarity
-        # util.cos_sim returns a tensor, so we convert it to a float
-        cosine_similarity = util.cos_sim(embedding1, embedding2).item()
+        # Embeddings are stored unit-length, so it's a plain dot product (no re-normalizing per call).
+        # For a single 384-dim pair torch's dispatch overhead outweighs the math; numpy's BLAS dot on
+        # zero-copy views of the CPU tensors is several times cheaper per call
+        cosine_similarity = float(np.dot(np.asarray(embedding1, dtype=np.float32).ravel(),
+                                         np.asarray(embedding2, dtype=np.float32).ravel()))
         return cosine_similarity
 
+    def calculate_similarity_matrix(self, embeddings1, embeddings2):
+        """
+        Calculates the cosine similarity of every row of embeddings1 with every row of embeddings2
+        in a single matrix multiplication.
+
+        Args:
+            embeddings1 (numpy.ndarray | torch.Tensor): Unit-length embeddings, shape (n, dim), e.g. from encode_many.
+            embeddings2 (numpy.ndarray | torch.Tensor): Unit-length embeddings, shape (m, dim).
+
+        Returns:
+            numpy.ndarray | torch.Tensor: The (n, m) similarity matrix, same type as the inputs.
+        """
+        return embeddings1 @ embeddings2.T
+
+    def rank(self, resume_text: str, job_texts: list[str], resume_embedding=None,
+             multi_process: bool = False) -> np.ndarray:
+        """
+        Scores many job texts against one resume: the jobs are encoded in one batched call and
+        compared in a single matrix-vector product, instead of one get_semantic_score call per job.
+
+        Args:
+            resume_text (str): The resume text.
+            job_texts (list[str]): The job descriptions to score.
+            resume_embedding (numpy.ndarray, optional): Precomputed embedding of resume_text.
+            multi_process (bool): Encode the jobs across the multi-process pool (see encode_many_mp).
+
+        Returns:
+            numpy.ndarray: One similarity score (between -1 and 1) per job text, in order.
+                           Empty texts score 0.0, as in get_semantic_score.
+        """
+        scores = np.zeros(len(job_texts))
+        valid = [i for i, text in enumerate(job_texts) if text]
+        if not resume_text or not valid:
+            return scores
+
+        if resume_embedding is None:
+            resume_embedding = self.encode_many([resume_text])[0]
+        valid_texts = [job_texts[i] for i in valid]
+        job_embeddings = self.encode_many_mp(valid_texts) if multi_process else self.encode_many(valid_texts)
+        # Unit-length embeddings make the dot product equal to cosine similarity
+        scores[valid] = job_embeddings @ resume_embedding
+        return scores
+
     def get_semantic_score(self, text1: str, text2: str) -> float:
         """
         Calculates the semantic similarity score between two raw text strings.
@@ -77,17 +271,58 @@ class SemanticMatcher:
             logger.warning("One or both texts are empty for semantic similarity calculation. Returning 0.0.")
             return 0.0
 
-        embedding1 = self.get_embedding(text1)
-        embedding2 = self.get_embedding(text2)
+        # Encode both texts in one batch (a single forward pass instead of two), or serve them from the cache
+        embeddings = self.encode_many([text1, text2])
+
+        # Unit-length embeddings: the dot product is the cosine similarity
+        return float(embeddings[0] @ embeddings[1])
+
+    def score_pairs(self, pairs: list[tuple[str, str]]) -> list[float]:
+        """
+        Calculates the semantic similarity of many (text1, text2) pairs with one batched encode call.
+
+        Args:
+            pairs (list[tuple[str, str]]): The text pairs to compare.
+
+        Returns:
+            list[float]: One similarity score (between -1 and 1) per pair, in order.
+                         Pairs with an empty text score 0.0, as in get_semantic_score.
+        """
+        scores = [0.0] * len(pairs)
+        valid = [i for i, (text1, text2) in enumerate(pairs) if text1 and text2]
+        if not valid:
+            return scores
+
+        flat_texts = [text for i in valid for text in pairs[i]] # text1, text2, text1, text2, ...
+        embeddings = self.encode_many(flat_texts)
+        # Unit-length embeddings: the row-wise dot product of the two halves is the cosine similarity
+        similarities = (embeddings[0::2] * embeddings[1::2]).sum(-1).tolist()
+        for i, similarity in zip(valid, similarities):
+            scores[i] = similarity
+        return scores
+
+_MATCHER = None
+_MATCHER_LOCK = threading.Lock()
 
-        return self.calculate_similarity(embedding1, embedding2)
+
+def get_matcher() -> SemanticMatcher:
+    """
+    Returns the process-wide SemanticMatcher, creating it on first use, so the model
+    (and its embedding cache) is loaded at most once per process however many callers need it.
+    """
+    global _MATCHER
+    if _MATCHER is None:
+        with _MATCHER_LOCK: # Concurrent first calls must not each load the model
+            if _MATCHER is None:
+                _MATCHER = SemanticMatcher()
+    return _MATCHER
 
 # --- For Testing / Example Usage ---
 if __name__ == "__main__":
     print("--- Testing SemanticMatcher ---")
 
     try:
-        matcher = SemanticMatcher()
+        matcher = get_matcher()
 
         # Sample texts
         resume_summary = "Experienced Python developer with a strong background in machine learning and data analysis."
@@ -111,6 +346,10 @@ if __name__ == "__main__":
         score4 = matcher.get_semantic_score(empty_text, empty_text)
         print(f"Similarity (Empty Text vs. Empty Text): {score4:.4f}") # Expecting 0.0
 
+        # Test 5: Ranking several jobs at once
+        ranked = matcher.rank(resume_summary, [job_description_ml, job_description_hr, empty_text])
+        print(f"Ranked similarities (ML, HR, Empty): {ranked.round(4).tolist()}") # Same as tests 1-3
+
 
     except Exception as e:
         logger.error(f"An error occurred during SemanticMatcher testing: {e}")
@@ -1,22 +1,32 @@
 import re
+import functools
+from collections import Counter
+
+# Words of 4+ characters: the length filter is part of the pattern, compiled once
+_WORD_RE = re.compile(r'\b\w{4,}\b')
+
+
+@functools.lru_cache(maxsize=128)
+def _job_word_freq(job_summary):
+    # Extract terms from job description and weight them by frequency.
+    # Cached so tailoring against the same job again skips this; callers must not modify the result.
+    return Counter(_WORD_RE.findall(job_summary.lower()))
+
 
 def tailor_resume(resume_text, job_summary, keywords=None):
     if keywords is None:
-        # Extract terms from job description
-        words = re.findall(r'\b\w+\b', job_summary.lower())
-        keywords = [w for w in words if len(w) > 3]  # filter short words
-
-    # Weight terms based on frequency
-    word_freq = {w: keywords.count(w) for w in set(keywords)}
-
-    # Score each line of resume by match with keywords
-    tailored_lines = []
-    for line in resume_text.split("\n"):
-        score = sum(word_freq.get(w.lower(), 0) for w in line.split())
-        tailored_lines.append((score, line))
-
-    # Sort and return lines by descending relevance
-    tailored_lines.sort(reverse=True)
-    sorted_resume = "\n".join(line for score, line in tailored_lines if line.strip())
+        word_freq = _job_word_freq(job_summary)
+    else:
+        # Weight terms based on frequency
+        word_freq = Counter(keywords)
+
+    # Score each non-blank line of resume by match with keywords
+    lines = [line for line in resume_text.split("\n") if line.strip()]
+    scores = [sum(word_freq.get(w, 0) for w in line.lower().split()) for line in lines]
+
+    # Sort and return lines by descending relevance.
+    # A stable sort on the score alone keeps equally relevant lines in their original order
+    order = sorted(range(len(lines)), key=scores.__getitem__, reverse=True)
+    sorted_resume = "\n".join(lines[i] for i in order)
 
     return sorted_resume
@@ -1,38 +1,61 @@
 import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from bs4 import BeautifulSoup, SoupStrainer
+from src.utils.common_helpers import jobs_to_batch, batches_to_table, write_jobs_csv
+
+BASE_URL = "https://ca.indeed.com/jobs"
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+MAX_FETCH_WORKERS = 8
+# Only job cards are parsed into the tree; the rest of the page is skipped
+JOB_CARD_STRAINER = SoupStrainer("a", class_="tapItem")
+
+def _fetch_page(session, query, location, page):
+    params = {
+        "q": query,
+        "l": location,
+        "start": page * 10
+    }
+    return session.get(BASE_URL, params=params).text
+
+def _parse_page(html):
+    # lxml's C parser is about twice as fast as html.parser
+    soup = BeautifulSoup(html, "lxml", parse_only=JOB_CARD_STRAINER)
 
-def scrape_indeed(query, location, pages=1):
     jobs = []
-    base_url = "https://ca.indeed.com/jobs"
-
-    for page in range(pages):
-        params = {
-            "q": query,
-            "l": location,
-            "start": page * 10
-        }
-        response = requests.get(base_url, params=params)
-        soup = BeautifulSoup(response.text, "html.parser")
-        
-        for card in soup.find_all("a", class_="tapItem"):
-            job_title = card.find("h2").text.strip()
-            company = card.find("span", class_="companyName").text.strip()
-            location = card.find("div", class_="companyLocation").text.strip()
-            summary = card.find("div", class_="job-snippet").text.strip().replace("\n", " ")
-            link = "https://ca.indeed.com" + card.get("href")
-            jobs.append({
-                "title": job_title,
-                "company": company,
-                "location": location,
-                "summary": summary,
-                "url": link
-            })
-
-    return pd.DataFrame(jobs)
+    for card in soup.find_all("a", class_="tapItem"):  # not nested links inside a card
+        job_title = card.find("h2").text.strip()
+        company = card.find("span", class_="companyName").text.strip()
+        job_location = card.find("div", class_="companyLocation").text.strip()
+        summary = card.find("div", class_="job-snippet").text.strip().replace("\n", " ")
+        link = "https://ca.indeed.com" + card.get("href")
+        jobs.append({
+            "title": job_title,
+            "company": company,
+            "location": job_location,
+            "summary": summary,
+            "url": link
+        })
+    return jobs
+
+def scrape_indeed_table(query, location, pages=1):
+    # Pages download in parallel over one keep-alive session; executor.map keeps them in page order.
+    # Parsing stays in this thread since it's CPU-bound
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=max(1, min(pages, MAX_FETCH_WORKERS))) as executor:
+        session.headers.update(HEADERS)
+        htmls = executor.map(lambda page: _fetch_page(session, query, location, page), range(pages))
+
+        # Each page becomes an Arrow record batch, so rows are columnar as soon as a page is parsed
+        batches = [jobs_to_batch(_parse_page(html)) for html in htmls]
+
+    return batches_to_table(batches)
+
+def scrape_indeed(query, location, pages=1):
+    return scrape_indeed_table(query, location, pages).to_pandas()
 
 # Example usage
+# Run from the project root as a module so the src package imports resolve:
+#   python -m src.scraping.indeed_scraper
 if __name__ == "__main__":
-    df = scrape_indeed("Mechanical Designer", "Vancouver, BC", pages=2)
-    df.to_csv("data/scraped_jobs.csv", index=False)
-    print(df.head())
+    table = scrape_indeed_table("Mechanical Designer", "Vancouver, BC", pages=2)
+    write_jobs_csv(table, "data/scraped_jobs.csv")
+    print(table.slice(0, 5).to_pandas())
@@ -1,42 +1,60 @@
 import asyncio
-import pandas as pd
 from playwright.async_api import async_playwright
-
-async def scrape_indeed(query, location, pages=1):
-    jobs = []
-
+from src.utils.common_helpers import jobs_to_batch, batches_to_table, write_jobs_csv
+
+# Reads every field of every job card on the page in one browser round-trip (missing elements give "")
+CARDS_FIELDS_JS = """els => els.map(el => ({
+    title: el.querySelector("h2")?.innerText ?? "",
+    company: el.querySelector(".companyName")?.innerText ?? "",
+    location: el.querySelector(".companyLocation")?.innerText ?? "",
+    summary: el.querySelector(".job-snippet")?.innerText ?? "",
+    link: el.getAttribute("href")
+}))"""
+
+def _card_to_job(fields):
+    link = fields["link"]
+
+    return {
+        "title": fields["title"].strip(),
+        "company": fields["company"].strip(),
+        "location": fields["location"].strip(),
+        "summary": fields["summary"].strip().replace("\n", " "),
+        "url": "https://ca.indeed.com" + link if link else ""
+    }
+
+async def _scrape_page(browser, query, location, page_num):
+    # Each results page gets its own tab so all pages load concurrently
+    page = await browser.new_page()
+    try:
+        start = page_num * 10
+        url = f"https://ca.indeed.com/jobs?q={query}&l={location}&start={start}"
+        await page.goto(url)
+        #print(await page.content())
+
+        job_cards = await page.eval_on_selector_all("a.tapItem", CARDS_FIELDS_JS)
+        return jobs_to_batch([_card_to_job(fields) for fields in job_cards])
+    finally:
+        await page.close()
+
+async def scrape_indeed_table(query, location, pages=1):
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-
-        for page_num in range(pages):
-            start = page_num * 10
-            url = f"https://ca.indeed.com/jobs?q={query}&l={location}&start={start}"
-            await page.goto(url)
-            #print(await page.content())
-
-            job_cards = await page.query_selector_all("a.tapItem")
-
-            for card in job_cards:
-                title = await card.query_selector_eval("h2", "el => el.innerText") or ""
-                company = await card.query_selector_eval(".companyName", "el => el.innerText") or ""
-                loc = await card.query_selector_eval(".companyLocation", "el => el.innerText") or ""
-                summary = await card.query_selector_eval(".job-snippet", "el => el.innerText") or ""
-                link = await card.get_attribute("href")
-
-                jobs.append({
-                    "title": title.strip(),
-                    "company": company.strip(),
-                    "location": loc.strip(),
-                    "summary": summary.strip().replace("\n", " "),
-                    "url": "https://ca.indeed.com" + link if link else ""
-                })
+
+        # gather keeps the per-page record batches in page order
+        batches = await asyncio.gather(*[
+            _scrape_page(browser, query, location, page_num) for page_num in range(pages)
+        ])
 
         await browser.close()
 
-    return pd.DataFrame(jobs)
+    return batches_to_table(batches)
+
+async def scrape_indeed(query, location, pages=1):
+    return (await scrape_indeed_table(query, location, pages)).to_pandas()
 
+# Run from the project root as a module so the src package imports resolve:
+#   python -m src.scraping.playwright_scraper
 if __name__ == "__main__":
-    df = asyncio.run(scrape_indeed("Mechanical+Designer", "Vancouver", pages=2))
-    df.to_csv("data/scraped_jobs.csv", index=False)
-    print(df.head())
+    table = asyncio.run(scrape_indeed_table("Mechanical+Designer", "Vancouver", pages=2))
+    write_jobs_csv(table, "data/scraped_jobs.csv")
+    print(table.slice(0, 5).to_pandas())
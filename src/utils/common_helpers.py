@@ -0,0 +1,28 @@
+import os
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+# Columns produced by the Indeed scrapers
+SCRAPED_JOB_SCHEMA = pa.schema([
+    ("title", pa.string()),
+    ("company", pa.string()),
+    ("location", pa.string()),
+    ("summary", pa.string()),
+    ("url", pa.string()),
+])
+
+
+def jobs_to_batch(jobs):
+    """Converts one page of scraped job dicts into an Arrow record batch."""
+    return pa.RecordBatch.from_pylist(jobs, schema=SCRAPED_JOB_SCHEMA)
+
+
+def batches_to_table(batches):
+    """Combines per-page record batches into one table (an empty table if there are none)."""
+    return pa.Table.from_batches(batches, schema=SCRAPED_JOB_SCHEMA)
+
+
+def write_jobs_csv(table, path):
+    """Writes scraped jobs to CSV with Arrow's multithreaded writer, skipping pandas."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    pa_csv.write_csv(table, path)
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Make the project packages (config, src) importable when running `python -m pytest` from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Manual scripts that read local resume/CSV files, not pytest tests
+collect_ignore = ["tailor_one.py", "test_extractor.py"]
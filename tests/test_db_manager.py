@@ -0,0 +1,59 @@
+import pytest
+
+from config.settings import settings
+from src.database.db_manager import DBManager
+
+
+def make_job(job_id, **fields):
+    return {'job_id': job_id, 'job_title': f"Title {job_id}", 'job_location': "Vancouver, BC",
+            'job_description': f"Description of {job_id}", 'job_apply_link': f"https://example.com/{job_id}", **fields}
+
+
+def make_match(job_id, final_score, matched_keywords=()):
+    return {'job_id': job_id, 'keyword_score': 10.0, 'semantic_score': 20.0,
+            'final_score': final_score, 'matched_keywords': list(matched_keywords)}
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DB_PATH", str(tmp_path / "jobs.db"))
+    manager = DBManager()
+    yield manager
+    manager.close()
+
+
+def test_insert_jobs_counts_only_new_rows(db):
+    assert db.insert_jobs([make_job("a"), make_job("b"), {'job_title': "no id"}]) == 2
+    assert db.insert_jobs([make_job("b"), make_job("c")]) == 1 # "b" already stored
+    assert db.get_all_job_ids() == {"a", "b", "c"}
+
+    job = db.get_job_by_id("a")
+    assert job['location'] == "Vancouver, BC" # JSearch's job_location
+    assert job['job_url'] == "https://example.com/a" # JSearch's job_apply_link
+    assert job['status'] == "new"
+
+
+def test_get_unscored_jobs_is_per_resume(db):
+    db.insert_jobs([make_job("a"), make_job("b"), make_job("c")])
+    assert {job['job_id'] for job in db.get_unscored_jobs("resume1")} == {"a", "b", "c"}
+
+    assert db.upsert_matches("resume1", [make_match("a", 50.0), make_match("c", 70.0)])
+    unscored = db.get_unscored_jobs("resume1")
+    assert [job['job_id'] for job in unscored] == ["b"]
+    assert unscored[0]['job_description'] == "Description of b" # Full rows, for matching
+    assert {job['job_id'] for job in db.get_unscored_jobs("resume2")} == {"a", "b", "c"}
+
+
+def test_upsert_matches_replaces_scores_and_ranks(db):
+    db.insert_jobs([make_job("a"), make_job("b"), make_job("c")])
+    db.upsert_matches("resume1", [make_match("a", 50.0), make_match("b", 60.0, ["design"]), make_match("c", 70.0)])
+    db.upsert_matches("resume1", [make_match("a", 90.0, ["python", "cad"])]) # Re-scoring overwrites
+    db.upsert_matches("resume2", [make_match("b", 99.0)])
+
+    jobs = db.get_jobs_with_scores("resume1")
+    assert [(job['job_id'], job['final_score']) for job in jobs] == [("a", 90.0), ("c", 70.0), ("b", 60.0)]
+    assert jobs[0]['matched_keywords'] == ["python", "cad"]
+    assert 'job_description' not in jobs[0] # Loaded on demand with get_job_by_id
+
+    assert [job['job_id'] for job in db.get_jobs_with_scores("resume1", limit=2)] == ["a", "c"]
+    assert [job['job_id'] for job in db.get_jobs_with_scores("resume2")] == ["b"]
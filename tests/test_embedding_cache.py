@@ -0,0 +1,90 @@
+import sqlite3
+
+import numpy as np
+
+from config.settings import settings
+from src.nlp import embedding_cache
+from src.nlp.embedding_cache import EmbeddingCache
+
+
+def unit_vectors(n, dim=8, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_memory_only_roundtrip():
+    cache = EmbeddingCache("model", db_path="")
+    vectors = unit_vectors(2)
+    stored = cache.put_many(["a", "b"], vectors)
+
+    assert stored.dtype == np.float32
+    np.testing.assert_allclose(stored, vectors, atol=1e-3) # Rounded through float16
+    hits = cache.get_many(["b", "missing", "a", "b"])
+    assert hits[1] is None
+    np.testing.assert_array_equal(hits[0], stored[1])
+    np.testing.assert_array_equal(hits[2], stored[0])
+    np.testing.assert_array_equal(hits[3], stored[1])
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = EmbeddingCache("model", db_path="", memory_size=2)
+    cache.put_many(["a", "b"], unit_vectors(2))
+    cache.get_many(["a"]) # "b" is now the least recently used
+    cache.put_many(["c"], unit_vectors(1, seed=1))
+
+    a, b, c = cache.get_many(["a", "b", "c"])
+    assert a is not None and b is None and c is not None
+
+
+def test_disk_tier_survives_restart_and_is_keyed_by_model(tmp_path):
+    db_path = str(tmp_path / "cache" / "embeddings.db")
+    cache = EmbeddingCache("model", db_path=db_path, memory_size=1)
+    stored = cache.put_many(["a", "b"], unit_vectors(2))
+    np.testing.assert_array_equal(cache.get_many(["a"])[0], stored[0]) # Evicted from memory, read from disk
+    cache.close()
+
+    reopened = EmbeddingCache("model", db_path=db_path)
+    a, b = reopened.get_many(["a", "b"])
+    np.testing.assert_array_equal(a, stored[0])
+    np.testing.assert_array_equal(b, stored[1])
+    assert EmbeddingCache("model|int8", db_path=db_path).get_many(["a"]) == [None]
+    reopened.close()
+
+
+def test_reads_settings_at_construction(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_PATH", "")
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_SIZE", 3)
+    cache = EmbeddingCache("model")
+    assert cache._conn is None and cache.memory_size == 3
+
+
+def test_disk_tier_prunes_least_recently_used(tmp_path, monkeypatch):
+    clock = iter(range(1, 100))
+    monkeypatch.setattr(embedding_cache.time, "time", lambda: next(clock))
+    db_path = str(tmp_path / "embeddings.db")
+    cache = EmbeddingCache("model", db_path=db_path, memory_size=1, disk_max=3)
+    for seed, text in enumerate(["a", "b", "c"]): # Stored at times 1, 2, 3
+        cache.put_many([text], unit_vectors(1, seed=seed))
+    assert cache.get_many(["b"])[0] is not None # Read back from disk (only "c" is in memory): time 4
+    cache.put_many(["d"], unit_vectors(1, seed=3)) # Over the cap: "a" is the least recently used
+    cache.put_many(["e"], unit_vectors(1, seed=4)) # Then "c", since "b" was read after it
+
+    assert cache._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] == 3
+    cache.close()
+    reopened = EmbeddingCache("model", db_path=db_path)
+    assert [hit is not None for hit in reopened.get_many(["a", "b", "c", "d", "e"])] == [False, True, False, True, True]
+    reopened.close()
+
+
+def test_adds_last_used_to_caches_created_before_the_cap(tmp_path):
+    db_path = str(tmp_path / "embeddings.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+    conn.commit()
+    conn.close()
+
+    cache = EmbeddingCache("model", db_path=db_path, disk_max=1)
+    cache.put_many(["a", "b"], unit_vectors(2))
+    assert cache.get_many(["a", "b"])[1] is not None
+    assert cache._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] == 1
+    cache.close()
@@ -0,0 +1,31 @@
+import random
+
+import pytest
+
+from src.matching.keyword_overlap import keyword_overlap_score
+
+VOCAB = ["design", "analysis", "testing", "manufacturing", "supply chain", "quality",
+         "simulation", "lead", "client", "vendor", "report", "technical reports"]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_jaccard_definition(seed):
+    rng = random.Random(seed)
+    resume = set(rng.sample(VOCAB, rng.randint(1, len(VOCAB))))
+    job = set(rng.sample(VOCAB, rng.randint(1, len(VOCAB))))
+
+    expected = len(resume & job) / len(resume | job)
+    assert keyword_overlap_score(frozenset(resume), frozenset(job)) == pytest.approx(expected)
+    assert keyword_overlap_score(sorted(resume), sorted(job)) == pytest.approx(expected) # Lists are converted
+
+
+def test_known_scores():
+    assert keyword_overlap_score({"design", "analysis"}, {"design", "testing"}) == pytest.approx(1 / 3)
+    assert keyword_overlap_score({"design"}, ["design", "design"]) == 1.0
+    assert keyword_overlap_score({"design"}, {"testing"}) == 0.0
+
+
+def test_empty_sets_score_zero():
+    assert keyword_overlap_score(frozenset(), frozenset({"design"})) == 0.0
+    assert keyword_overlap_score({"design"}, []) == 0.0
+    assert keyword_overlap_score([], []) == 0.0
@@ -0,0 +1,54 @@
+import random
+import re
+from collections import Counter
+
+import pytest
+
+from src.resume.resume_tailor import tailor_resume
+
+VOCAB = ["python", "Python", "design", "CAD", "solidworks", "lean", "the", "and", "of",
+         "manufacturing", "Manufacturing,", "testing", "gd&t", "team", "lead", "data", "analysis"]
+
+
+def reference_tailor(resume_text, job_summary, keywords=None):
+    """Reference scoring: a per-line dict lookup and a stable sort on score, written independently."""
+    if keywords is None:
+        keywords = [w for w in re.findall(r'\b\w+\b', job_summary.lower()) if len(w) > 3]
+    word_freq = Counter(keywords)
+    scored = [(sum(word_freq.get(w, 0) for w in line.lower().split()), line)
+              for line in resume_text.split("\n") if line.strip()]
+    scored.sort(key=lambda item: item[0], reverse=True) # Stable: ties keep resume order
+    return "\n".join(line for _, line in scored)
+
+
+def random_text(rng, lines, words_per_line):
+    return "\n".join(
+        " ".join(rng.choice(VOCAB) for _ in range(rng.randint(0, words_per_line))) if rng.random() > 0.1 else "   "
+        for _ in range(lines)
+    )
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_matches_reference_on_random_inputs(seed):
+    rng = random.Random(seed)
+    resume = random_text(rng, rng.randint(0, 30), 12)
+    job = random_text(rng, rng.randint(0, 10), 20)
+    assert tailor_resume(resume, job) == reference_tailor(resume, job)
+
+    keywords = [rng.choice(VOCAB).lower() for _ in range(rng.randint(0, 15))]
+    assert tailor_resume(resume, job, keywords) == reference_tailor(resume, job, keywords)
+
+
+def test_orders_by_relevance_and_drops_blank_lines():
+    resume = "Managed a team\n\nDesigned parts in SolidWorks and SolidWorks PDM\nLed design reviews"
+    job = "SolidWorks designer: design parts in SolidWorks"
+    assert tailor_resume(resume, job).split("\n") == [
+        "Designed parts in SolidWorks and SolidWorks PDM", # solidworks x2 (weight 2 each) + parts
+        "Led design reviews",
+        "Managed a team",
+    ]
+
+
+def test_empty_inputs():
+    assert tailor_resume("", "anything at all") == ""
+    assert tailor_resume("only line", "") == "only line"
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+
+from sentence_transformers import SentenceTransformer
+from config.settings import settings
+from src.nlp import semantic_matcher
+
+pytestmark = pytest.mark.skipif(not torch.cuda.is_available(), reason="fp16 inference is only used on CUDA")
+
+PAIRS = [
+    ("Experienced Python developer with a background in machine learning.",
+     "We are seeking a Machine Learning Engineer to deploy AI solutions."),
+    ("Mechanical designer skilled in SolidWorks, GD&T and lean manufacturing.",
+     "Looking for a CAD designer to produce drawings for sheet metal parts."),
+    ("Registered nurse with five years of ICU experience.",
+     "Senior backend engineer to build distributed payment systems in Go."),
+    ("Supply chain analyst who optimizes inventory with SQL and Excel.",
+     "HR manager to handle employee relations and recruitment."),
+    ("Led a team of four engineers testing automotive components.",
+     "Test engineer for automotive component validation and reporting."),
+]
+
+
+def test_fp16_scores_match_fp32(monkeypatch):
+    monkeypatch.setattr(settings, "SEMANTIC_GPU_HALF_PRECISION", True)
+    monkeypatch.setattr(settings, "SEMANTIC_BACKEND", "torch")
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_PATH", "") # Memory-only cache
+
+    matcher = semantic_matcher.SemanticMatcher()
+    assert matcher.cache.model_tag.endswith("|fp16")
+    half_scores = np.array(matcher.score_pairs(PAIRS))
+
+    baseline = SentenceTransformer(semantic_matcher.SENTENCE_TRANSFORMER_MODEL, device="cuda")
+    embeddings = baseline.encode([text for pair in PAIRS for text in pair], normalize_embeddings=True)
+    full_scores = (embeddings[0::2] * embeddings[1::2]).sum(-1)
+
+    assert np.abs(half_scores - full_scores).max() < 1e-3